@@ -1,101 +1,195 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+import json
 import uuid
 
+from backend.core.config import settings
 from backend.core.database import get_db
+from backend.core.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_before
 from backend.models.models import Conversation, Message, Article
 from backend.schemas.schemas import (
     ChatMessage, 
     ChatResponse, 
     Conversation as ConversationSchema,
-    Message as MessageSchema,
     Article as ArticleSchema
 )
-from backend.services.ai_service import ai_service
+from backend.services.context_service import context_service
+from backend.services.response_cache_service import response_cache_service
+from backend.services.retrieval_service import retrieval_service
 
 router = APIRouter()
 
+async def _add_message(db: AsyncSession, conversation_id: int, content: str, role: str):
+    """Add a message and bump the conversation's maintained count in the same transaction"""
+    db.add(Message(conversation_id=conversation_id, content=content, role=role))
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(message_count=Conversation.message_count + 1, last_message_at=func.now())
+    )
+
+async def _prepare_chat(chat_message: ChatMessage, db: AsyncSession):
+    """Resolve the conversation, store the user turn and gather context for a reply
+    
+    Returns the conversation, its bounded chat context and relevant articles.
+    """
+    # Get or create conversation
+    conversation = None
+    if chat_message.session_id:
+        result = await db.execute(select(Conversation).where(
+            Conversation.session_id == chat_message.session_id
+        ))
+        conversation = result.scalars().first()
+    
+    if not conversation:
+        # Create new conversation
+        conversation = Conversation(
+            session_id=str(uuid.uuid4()),
+            user_id=chat_message.user_id
+        )
+        db.add(conversation)
+        await db.commit()
+        await db.refresh(conversation)
+    
+    # Rolling summary plus the recent turns that fit the prompt budget; read
+    # before the user turn is saved, since the prompt appends it separately
+    context = await context_service.build(db, conversation)
+    
+    # Save the user turn now, so no write transaction stays open during the LLM call
+    await _add_message(db, conversation.id, chat_message.message, "user")
+    await db.commit()
+    
+    # Articles relevant to the message; the latest ones if nothing matches
+    article_ids = retrieval_service.search(chat_message.message, k=settings.CHAT_CONTEXT_ARTICLES)
+    if article_ids:
+        result = await db.execute(select(Article).where(Article.id.in_(article_ids)))
+        by_id = {article.id: article for article in result.scalars()}
+        articles = [by_id[article_id] for article_id in article_ids if article_id in by_id]
+    else:
+        result = await db.execute(
+            select(Article)
+            .where(Article.canonical_id.is_(None))
+            .order_by(Article.created_at.desc())
+            .limit(settings.CHAT_CONTEXT_ARTICLES)
+        )
+        articles = result.scalars().all()
+    
+    return (
+        conversation,
+        context,
+        retrieval_service.fit_to_budget([ArticleSchema.from_orm(article) for article in articles])
+    )
+
+def _sources(articles: List[ArticleSchema]) -> List[str]:
+    """URLs cited alongside an assistant reply"""
+    return [article.url for article in articles[:3] if article.url]
+
+def _sse(event: str, data: dict) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     chat_message: ChatMessage,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
 ):
     """Send a message to the AI assistant"""
     try:
-        # Get or create conversation
-        conversation = None
-        if chat_message.session_id:
-            conversation = db.query(Conversation).filter(
-                Conversation.session_id == chat_message.session_id
-            ).first()
+        conversation, context, article_schemas = await _prepare_chat(chat_message, db)
         
-        if not conversation:
-            # Create new conversation
-            session_id = str(uuid.uuid4())
-            conversation = Conversation(
-                session_id=session_id,
-                user_id=chat_message.user_id
-            )
-            db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-        else:
-            session_id = conversation.session_id
-        
-        # Save user message
-        user_message = Message(
-            conversation_id=conversation.id,
-            content=chat_message.message,
-            role="user"
-        )
-        db.add(user_message)
-        
-        # Get conversation history
-        history = db.query(Message).filter(
-            Message.conversation_id == conversation.id
-        ).order_by(Message.timestamp.desc()).limit(20).all()
-        
-        # Get recent articles for context
-        articles = db.query(Article).order_by(Article.created_at.desc()).limit(10).all()
-        article_schemas = [ArticleSchema.from_orm(article) for article in articles]
-        
-        # Generate AI response
-        ai_response = ai_service.chat_response(
-            message=chat_message.message,
-            conversation_history=[MessageSchema.from_orm(msg) for msg in history],
-            articles=article_schemas
+        # Generate AI response, reusing a cached one for a repeated first-turn question
+        ai_response = await response_cache_service.chat_response(
+            chat_message.message, context, article_schemas
         )
         
         # Save AI response
-        assistant_message = Message(
-            conversation_id=conversation.id,
-            content=ai_response,
-            role="assistant"
-        )
-        db.add(assistant_message)
-        db.commit()
+        await _add_message(db, conversation.id, ai_response, "assistant")
+        await db.commit()
+        background_tasks.add_task(context_service.refresh, conversation.id)
         
         return ChatResponse(
             response=ai_response,
-            session_id=session_id,
-            sources=[article.url for article in articles[:3] if article.url]
+            session_id=conversation.session_id,
+            sources=_sources(article_schemas)
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+@router.post("/message/stream")
+async def stream_message(
+    chat_message: ChatMessage,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
+    """Send a message to the AI assistant and stream the reply as Server-Sent Events
+    
+    Emits a ``session`` event first, one ``token`` event per generated chunk,
+    then a final ``done`` event carrying the sources once the reply is saved.
+    """
+    try:
+        conversation, context, article_schemas = await _prepare_chat(chat_message, db)
+    except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+    
+    async def event_stream():
+        yield _sse("session", {"session_id": conversation.session_id})
+        
+        chunks = []
+        try:
+            async for token in response_cache_service.stream_chat_response(
+                chat_message.message, context, article_schemas
+            ):
+                chunks.append(token)
+                yield _sse("token", {"content": token})
+            
+            # Save the assembled AI response
+            await _add_message(db, conversation.id, "".join(chunks), "assistant")
+            await db.commit()
+            
+            yield _sse("done", {
+                "session_id": conversation.session_id,
+                "sources": _sources(article_schemas)
+            })
+            
+        except Exception as e:
+            await db.rollback()
+            yield _sse("error", {"detail": f"Error processing message: {str(e)}"})
+    
+    # Runs once the stream has finished and the reply is saved
+    background_tasks.add_task(context_service.refresh, conversation.id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """Hit/miss counts for the chat response cache"""
+    return response_cache_service.get_stats()
 
 @router.get("/history/{session_id}", response_model=ConversationSchema)
 async def get_conversation_history(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get conversation history for a session"""
     try:
-        conversation = db.query(Conversation).filter(
-            Conversation.session_id == session_id
-        ).first()
+        result = await db.execute(
+            select(Conversation)
+            .options(selectinload(Conversation.messages))
+            .where(Conversation.session_id == session_id)
+        )
+        conversation = result.scalars().first()
         
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
@@ -110,7 +204,7 @@ async def get_conversation_history(
 @router.post("/new-session")
 async def create_new_session(
     user_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new conversation session"""
     try:
@@ -120,64 +214,93 @@ async def create_new_session(
             user_id=user_id
         )
         db.add(conversation)
-        db.commit()
+        await db.commit()
         
         return {"session_id": session_id}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
 
 @router.get("/sessions")
 async def get_user_sessions(
     user_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all conversation sessions for a user"""
+    """Get a user's conversation sessions, newest first
+    
+    Pages are keyed on (created_at, id); pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page.
+    """
     try:
-        conversations = db.query(Conversation).filter(
-            Conversation.user_id == user_id
-        ).order_by(Conversation.created_at.desc()).all()
+        query = (
+            select(
+                Conversation.id,
+                Conversation.session_id,
+                Conversation.created_at,
+                Conversation.message_count,
+                Conversation.last_message_at,
+            )
+            .where(Conversation.user_id == user_id)
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.where(keyset_before(Conversation, decode_cursor(cursor)))
+        
+        result = await db.execute(query)
+        rows = result.all()
+        
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
         
         return [
             {
-                "session_id": conv.session_id,
-                "created_at": conv.created_at,
-                "message_count": len(conv.messages)
+                "session_id": row.session_id,
+                "created_at": row.created_at,
+                "message_count": row.message_count,
+                "last_message_at": row.last_message_at
             }
-            for conv in conversations
+            for row in rows
         ]
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sessions: {str(e)}")
 
 @router.delete("/session/{session_id}")
 async def delete_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a conversation session"""
     try:
-        conversation = db.query(Conversation).filter(
+        result = await db.execute(select(Conversation).where(
             Conversation.session_id == session_id
-        ).first()
+        ))
+        conversation = result.scalars().first()
         
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         
         # Delete all messages first
-        db.query(Message).filter(
+        await db.execute(delete(Message).where(
             Message.conversation_id == conversation.id
-        ).delete()
+        ))
         
         # Delete conversation
-        db.delete(conversation)
-        db.commit()
+        await db.delete(conversation)
+        await db.commit()
         
         return {"message": "Session deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting session: {str(e)}") 
\ No newline at end of file
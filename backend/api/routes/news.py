@@ -1,33 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
 from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from backend.core.database import get_db
+from backend.core.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    decode_score_cursor,
+    encode_cursor,
+    encode_score_cursor,
+    keyset_before,
+)
 from backend.models.models import Article
-from backend.schemas.schemas import Article as ArticleSchema, NewsBriefing
-from backend.services.news_service import news_service
-from backend.services.ai_service import ai_service
+from backend.schemas.schemas import Article as ArticleSchema, ArticleSearchResult, NewsBriefing
+from backend.services.briefing_service import briefing_service
+from backend.services.ingestion_service import ingestion_service
+from backend.services.personalized_briefing_service import personalized_briefing_service
+from backend.services.search_service import search_service
+from backend.services.summary_service import summary_service
+from backend.services.trending_service import trending_service
 
 router = APIRouter()
 
 @router.get("/briefing", response_model=NewsBriefing)
-async def get_morning_briefing(db: Session = Depends(get_db)):
-    """Get the morning news briefing"""
+async def get_morning_briefing(user_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Get the morning news briefing
+    
+    With ``user_id``, returns the briefing pre-generated for that user's
+    categories and tone; users without preferences get the generic one.
+    """
     try:
-        # Get latest articles from database
-        articles = db.query(Article).order_by(Article.created_at.desc()).limit(20).all()
+        if user_id:
+            personalized = await personalized_briefing_service.get_for_user(db, user_id)
+            if personalized:
+                summary, article_schemas, generated_at = personalized
+                return NewsBriefing(
+                    summary=summary,
+                    articles=article_schemas,
+                    generated_at=generated_at,
+                    categories=list(set([article.category for article in article_schemas if article.category]))
+                )
+        
+        # Get latest articles from database, one copy per story
+        result = await db.execute(
+            select(Article)
+            .where(Article.canonical_id.is_(None))
+            .order_by(Article.created_at.desc())
+            .limit(20)
+        )
+        articles = result.scalars().all()
         
-        # If no articles in DB, fetch fresh ones
+        # If no articles in DB, ask the scheduler to ingest now rather than
+        # fetching upstream on this request
         if not articles:
-            await refresh_news(db)
-            articles = db.query(Article).order_by(Article.created_at.desc()).limit(20).all()
+            ingestion_service.trigger()
         
         # Convert to schema objects
         article_schemas = [ArticleSchema.from_orm(article) for article in articles]
         
-        # Generate AI briefing
-        briefing_text = ai_service.generate_morning_briefing(article_schemas)
+        # Generate AI briefing, reusing the cached one for the same article set
+        briefing_text, generated_at = await briefing_service.get_briefing(article_schemas)
         
         # Get categories
         categories = list(set([article.category for article in articles if article.category]))
@@ -35,95 +70,172 @@ async def get_morning_briefing(db: Session = Depends(get_db)):
         return NewsBriefing(
             summary=briefing_text,
             articles=article_schemas[:10],  # Top 10 articles
-            generated_at=datetime.now(),
+            generated_at=generated_at,
             categories=categories
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating briefing: {str(e)}")
 
+# Columns a client may request through ``fields=``
+ARTICLE_FIELDS = list(ArticleSchema.model_fields)
+
+def _parse_fields(fields: str) -> List[str]:
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in ARTICLE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(ARTICLE_FIELDS)}"
+        )
+    return requested
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
 @router.get("/articles", response_model=List[ArticleSchema])
 async def get_articles(
-    limit: int = 20,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
     category: str = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get paginated articles"""
+    """Get paginated articles, newest first
+    
+    Pages are keyed on (created_at, id); pass the ``X-Next-Cursor`` response
+    header back as ``cursor`` to fetch the next page. ``fields`` is a
+    comma-separated list of columns to return (e.g. ``id,title,url``); only
+    those columns are read from the database.
+    """
     try:
-        query = db.query(Article).order_by(Article.created_at.desc())
+        requested = _parse_fields(fields) if fields else None
         
-        if category:
-            query = query.filter(Article.category == category)
+        if requested:
+            # The cursor needs created_at and id even if the client didn't ask for them
+            columns = list(dict.fromkeys(requested + ["created_at", "id"]))
+            query = select(*[getattr(Article, name) for name in columns])
+        else:
+            query = select(Article)
         
-        articles = query.limit(limit).all()
-        return [ArticleSchema.from_orm(article) for article in articles]
+        query = query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1)
         
+        if category:
+            query = query.where(Article.category == category)
+        if cursor:
+            query = query.where(keyset_before(Article, decode_cursor(cursor)))
+        
+        result = await db.execute(query)
+        rows = result.all() if requested else result.scalars().all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        
+        if not requested:
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return [ArticleSchema.from_orm(article) for article in rows]
+        
+        # Partial rows don't fit the response model, so serialize them directly
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(
+            [{name: _json_value(getattr(row, name)) for name in requested} for row in rows],
+            headers=headers
+        )
+        
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching articles: {str(e)}")
 
+@router.get("/search", response_model=List[ArticleSearchResult])
+async def search_articles(
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over article titles, descriptions and bodies
+    
+    Results are ranked by relevance with a highlighted snippet. Pass the
+    ``X-Next-Cursor`` response header back as ``cursor`` for the next page.
+    """
+    try:
+        after = decode_score_cursor(cursor) if cursor else None
+        results, has_more = await search_service.search(db, q, limit=limit, after=after)
+        
+        if has_more:
+            response.headers["X-Next-Cursor"] = encode_score_cursor(results[-1]["score"], results[-1]["id"])
+        return [ArticleSearchResult(**result) for result in results]
+        
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching articles: {str(e)}")
+
 @router.get("/categories")
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_db)):
     """Get available news categories"""
     try:
-        categories = db.query(Article.category).distinct().all()
-        return [cat[0] for cat in categories if cat[0]]
+        result = await db.execute(select(Article.category).distinct())
+        return [cat[0] for cat in result.all() if cat[0]]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
 @router.post("/refresh")
-async def refresh_news(db: Session = Depends(get_db)):
+async def refresh_news():
     """Fetch fresh news from all sources"""
     try:
-        # Fetch articles from news services
-        articles = await news_service.fetch_all_news()
-        
-        # Save to database
-        saved_count = 0
-        for article_data in articles:
-            # Check if article already exists
-            existing = db.query(Article).filter(
-                Article.title == article_data.title,
-                Article.source == article_data.source
-            ).first()
-            
-            if not existing:
-                article = Article(**article_data.dict())
-                db.add(article)
-                saved_count += 1
-        
-        db.commit()
+        result = await ingestion_service.run_once()
         
         return {
             "message": f"Successfully refreshed news",
-            "fetched": len(articles),
-            "saved": saved_count
+            "fetched": result["fetched"],
+            "saved": result["saved"],
+            "duplicates": result["duplicates"],
+            "near_duplicates": result["near_duplicates"]
         }
         
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error refreshing news: {str(e)}")
 
+@router.get("/ingestion/status")
+async def get_ingestion_status():
+    """Get the status of the background news refresh"""
+    return ingestion_service.status
+
+@router.get("/briefing/schedule/status")
+async def get_briefing_schedule_status():
+    """Get the status of personalized briefing pre-generation"""
+    return personalized_briefing_service.status
+
 @router.get("/trending")
-async def get_trending_topics():
-    """Get trending topics from current news"""
+async def get_trending_topics(limit: int = 10, db: AsyncSession = Depends(get_db)):
+    """Get trending topics, ranked by time-decayed mentions in stored news"""
     try:
-        topics = await news_service.get_trending_topics()
+        topics = await trending_service.top(db, limit=limit)
         return {"topics": topics}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trending topics: {str(e)}")
 
 @router.get("/article/{article_id}/summary")
-async def get_article_summary(article_id: int, db: Session = Depends(get_db)):
+async def get_article_summary(article_id: int, db: AsyncSession = Depends(get_db)):
     """Get AI-generated summary for a specific article"""
     try:
-        article = db.query(Article).filter(Article.id == article_id).first()
+        article = await db.get(Article, article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         
-        article_schema = ArticleSchema.from_orm(article)
-        summary = ai_service.summarize_article(article_schema)
+        # Stored summaries are reused until the article's content changes
+        summary = await summary_service.get_summary(article)
         
         return {"summary": summary}
         
@@ -1,45 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import json
 
 from backend.core.database import get_db
 from backend.models.models import UserPreference
 from backend.schemas.schemas import UserPreference as UserPreferenceSchema, UserPreferenceCreate
+from backend.services.preference_service import preference_service
 
 router = APIRouter()
 
 @router.get("/preferences/{user_id}", response_model=UserPreferenceSchema)
 async def get_user_preferences(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user preferences"""
     try:
-        preferences = db.query(UserPreference).filter(
-            UserPreference.user_id == user_id
-        ).first()
-        
-        if not preferences:
-            # Create default preferences
-            default_categories = ["general", "business", "technology"]
-            preferences = UserPreference(
-                user_id=user_id,
-                preferred_categories=json.dumps(default_categories),
-                tone_preference="casual",
-                briefing_time="08:00"
-            )
-            db.add(preferences)
-            db.commit()
-            db.refresh(preferences)
+        preferences = await preference_service.get(db, user_id)
+        if preferences:
+            return preferences
         
-        # Convert JSON string back to list for response
-        categories = json.loads(preferences.preferred_categories) if preferences.preferred_categories else []
+        # Create default preferences
+        default_categories = ["general", "business", "technology"]
+        preferences = UserPreference(
+            user_id=user_id,
+            preferred_categories=json.dumps(default_categories),
+            tone_preference="casual",
+            briefing_time="08:00"
+        )
+        db.add(preferences)
+        await db.commit()
+        await db.refresh(preferences)
+        await preference_service.invalidate(user_id)
         
         return UserPreferenceSchema(
             id=preferences.id,
             user_id=preferences.user_id,
-            preferred_categories=categories,
+            preferred_categories=default_categories,
             tone_preference=preferences.tone_preference,
             briefing_time=preferences.briefing_time,
             created_at=preferences.created_at
@@ -51,22 +50,24 @@ async def get_user_preferences(
 @router.post("/preferences", response_model=UserPreferenceSchema)
 async def create_or_update_preferences(
     preferences: UserPreferenceCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create or update user preferences"""
     try:
         # Check if preferences already exist
-        existing = db.query(UserPreference).filter(
+        result = await db.execute(select(UserPreference).where(
             UserPreference.user_id == preferences.user_id
-        ).first()
+        ))
+        existing = result.scalars().first()
         
         if existing:
             # Update existing preferences
             existing.preferred_categories = json.dumps(preferences.preferred_categories)
             existing.tone_preference = preferences.tone_preference
             existing.briefing_time = preferences.briefing_time
-            db.commit()
-            db.refresh(existing)
+            await db.commit()
+            await db.refresh(existing)
+            await preference_service.invalidate(preferences.user_id)
             
             return UserPreferenceSchema(
                 id=existing.id,
@@ -85,8 +86,9 @@ async def create_or_update_preferences(
                 briefing_time=preferences.briefing_time
             )
             db.add(new_preferences)
-            db.commit()
-            db.refresh(new_preferences)
+            await db.commit()
+            await db.refresh(new_preferences)
+            await preference_service.invalidate(preferences.user_id)
             
             return UserPreferenceSchema(
                 id=new_preferences.id,
@@ -98,25 +100,22 @@ async def create_or_update_preferences(
             )
             
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating preferences: {str(e)}")
 
 @router.get("/preferences/{user_id}/categories")
 async def get_user_categories(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get user's preferred categories"""
     try:
-        preferences = db.query(UserPreference).filter(
-            UserPreference.user_id == user_id
-        ).first()
+        preferences = await preference_service.get(db, user_id)
         
         if not preferences:
             return {"categories": ["general", "business", "technology"]}
         
-        categories = json.loads(preferences.preferred_categories) if preferences.preferred_categories else []
-        return {"categories": categories}
+        return {"categories": preferences.preferred_categories}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
@@ -125,13 +124,14 @@ async def get_user_categories(
 async def update_user_categories(
     user_id: str,
     categories: List[str],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user's preferred categories"""
     try:
-        preferences = db.query(UserPreference).filter(
+        result = await db.execute(select(UserPreference).where(
             UserPreference.user_id == user_id
-        ).first()
+        ))
+        preferences = result.scalars().first()
         
         if not preferences:
             # Create new preferences
@@ -146,15 +146,21 @@ async def update_user_categories(
             # Update existing
             preferences.preferred_categories = json.dumps(categories)
         
-        db.commit()
-        db.refresh(preferences)
+        await db.commit()
+        await db.refresh(preferences)
+        await preference_service.invalidate(user_id)
         
         return {"message": "Categories updated successfully", "categories": categories}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating categories: {str(e)}")
 
+@router.get("/cache/stats")
+async def get_preference_cache_stats():
+    """Hit/miss counts for the user preferences cache"""
+    return preference_service.get_stats()
+
 @router.get("/available-categories")
 async def get_available_categories():
     """Get all available news categories"""
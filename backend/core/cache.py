@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(values: Iterable, ordered: bool = False) -> str:
+    """Stable fingerprint of a set of identifiers
+
+    Order-independent unless ``ordered``, for keys whose result depends on
+    the order of the values (e.g. articles in a prompt).
+    """
+    values = [str(value) for value in values]
+    joined = ",".join(values if ordered else sorted(values))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, namespace: str, maxsize: int = None, ttl: int = None):
+        self.namespace = namespace
+        self.maxsize = maxsize or settings.CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    """Redis-backed cache shared across workers; values are stored as JSON
+
+    Redis being down or slow must not fail requests: errors are logged and
+    reads count as misses, writes as no-ops.
+    """
+
+    def __init__(self, namespace: str, ttl: int = None, url: str = None):
+        import redis.asyncio as redis
+        from redis.exceptions import RedisError
+
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL
+        self.client = redis.from_url(
+            url or settings.REDIS_URL,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+        self.errors = (RedisError, OSError)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self._key(key))
+        except self.errors as e:
+            logger.warning(f"Redis cache {self.namespace} unavailable, treating get as a miss: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        try:
+            await self.client.set(self._key(key), json.dumps(value, default=str), ex=ttl)
+        except self.errors as e:
+            logger.warning(f"Redis cache {self.namespace} unavailable, skipping set: {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self._key(key))
+        except self.errors as e:
+            logger.warning(f"Redis cache {self.namespace} unavailable, skipping delete: {e}")
+
+    async def clear(self) -> None:
+        try:
+            keys = [key async for key in self.client.scan_iter(match=f"{self.namespace}:*")]
+            if keys:
+                await self.client.delete(*keys)
+        except self.errors as e:
+            logger.warning(f"Redis cache {self.namespace} unavailable, skipping clear: {e}")
+
+
+def create_cache(namespace: str, maxsize: int = None, ttl: int = None):
+    """Build a cache for ``namespace`` using the configured CACHE_BACKEND"""
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCache(namespace, ttl=ttl)
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-process cache")
+
+    return MemoryCache(namespace, maxsize=maxsize, ttl=ttl)
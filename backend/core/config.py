@@ -5,9 +5,17 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./morning_news.db")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this many seconds
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_WAL: bool = True  # WAL journal with synchronous=NORMAL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_SOCKET_TIMEOUT: float = 1.0  # Seconds before a slow or unreachable Redis counts as a cache miss
     
     # News APIs
     NEWS_API_KEY: str = os.getenv("NEWS_API_KEY", "")
@@ -15,6 +23,7 @@ class Settings(BaseSettings):
     
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # Empty for api.openai.com; set for a proxy or local stub
     
     # Application
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -31,14 +40,87 @@ class Settings(BaseSettings):
     NEWS_API_BASE_URL: str = "https://newsapi.org/v2"
     GUARDIAN_API_BASE_URL: str = "https://content.guardianapis.com"
     
+    # Shared upstream HTTP client for news APIs
+    NEWS_HTTP_MAX_CONNECTIONS: int = 20
+    NEWS_HTTP_MAX_KEEPALIVE: int = 10
+    NEWS_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    NEWS_HTTP_CONNECT_TIMEOUT: float = 5.0
+    NEWS_HTTP_READ_TIMEOUT: float = 15.0
+    NEWS_HTTP2: bool = True  # Used when the h2 package is installed
+    
     # AI Configuration
     OPENAI_MODEL: str = "gpt-4"
     MAX_TOKENS: int = 1000
     TEMPERATURE: float = 0.7
+    OPENAI_TIMEOUT: float = 30.0  # Default per-call timeout in seconds
+    OPENAI_MAX_RETRIES: int = 2
+    
+    # Batched article summaries
+    SUMMARY_BATCH_TOKEN_BUDGET: int = 3000  # Article text per batch summary request
+    SUMMARY_BATCH_MAX_ARTICLES: int = 10
+    
+    # Summaries generated for new articles during ingestion
+    PRESUMMARIZE_ON_INGEST: bool = os.getenv("PRESUMMARIZE_ON_INGEST", "False").lower() == "true"
+    PRESUMMARIZE_CONCURRENCY: int = 4  # Parallel summary requests during pre-summarization
+    
+    # Chat context sent with each prompt
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1500  # Verbatim chat turns sent with each prompt
+    CHAT_RECENT_TURNS: int = 3  # Latest turns never folded into the summary
+    CHAT_SUMMARIZE_EVERY_TURNS: int = 4  # Fold older turns once this many have piled up
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    CHAT_CONTEXT_ARTICLES: int = 5  # Most relevant articles sent with a chat turn
+    CHAT_NEWS_TOKEN_BUDGET: int = 500
+    
+    # Offline relevance index that picks chat context articles
+    RETRIEVAL_WINDOW_HOURS: int = 72  # Older stories aren't offered as current news
+    RETRIEVAL_REFRESH_INTERVAL: int = 60  # Seconds between picking up articles other workers stored
+    
+    # Reuse replies to repeated first-turn questions about the same news
+    CHAT_RESPONSE_CACHE_ENABLED: bool = os.getenv("CHAT_RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+    CHAT_RESPONSE_CACHE_TTL: int = 900  # 15 minutes
+    CHAT_RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    CHAT_RESPONSE_CACHE_SIMILARITY: float = 0.75  # Word-set Jaccard needed to reuse a reply
     
     # Cache settings
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")  # 'memory' or 'redis'
     CACHE_TTL: int = 3600  # 1 hour
+    CACHE_MAX_ENTRIES: int = 1024
+    
+    # User preferences cache
+    PREFERENCES_CACHE_TTL: int = 300  # Bounds staleness in other workers with the memory backend
+    PREFERENCES_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Coalescing of identical concurrent generations
+    SINGLEFLIGHT_LOCK_TTL: float = 120.0  # Seconds before another worker may take over a stalled call
+    
+    # Scheduled news refresh
+    NEWS_REFRESH_ENABLED: bool = os.getenv("NEWS_REFRESH_ENABLED", "True").lower() == "true"
     NEWS_REFRESH_INTERVAL: int = 1800  # 30 minutes
+    NEWS_REFRESH_JITTER: float = 0.1  # +/- fraction of the interval
+    
+    # Ingestion
+    INGEST_BATCH_SIZE: int = 500  # Rows per bulk insert statement
+    
+    # Near-duplicate story detection
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 4  # SimHash bits two copies of a story may differ by
+    
+    # Trending topics
+    TRENDING_HALF_LIFE_HOURS: float = 6.0
+    TRENDING_WINDOW_HOURS: int = 48
+    
+    # Full-text search
+    # Only the newest this many matches are ranked, bounding the cost of broad
+    # terms; older matches beyond it never appear. 0 ranks every match.
+    SEARCH_CANDIDATE_LIMIT: int = 2000
+    
+    # Personalized briefings generated ahead of each user's briefing_time
+    PERSONALIZED_BRIEFING_ENABLED: bool = os.getenv("PERSONALIZED_BRIEFING_ENABLED", "True").lower() == "true"
+    PERSONALIZED_BRIEFING_WINDOW_MINUTES: int = 180  # Generations are spread over this long before the deadline
+    PERSONALIZED_BRIEFING_MIN_LEAD_MINUTES: int = 15  # Deadline: this long before the earliest briefing_time
+    PERSONALIZED_BRIEFING_CONCURRENCY: int = 2  # Parallel generation requests
+    PERSONALIZED_BRIEFING_TICK: int = 60  # Seconds between scheduler passes
+    PERSONALIZED_BRIEFING_RETRY_DELAY: int = 300  # Seconds before retrying a failed variant
+    PERSONALIZED_BRIEFING_MAX_AGE_HOURS: int = 24  # Older stored briefings aren't served
     
     class Config:
         env_file = ".env"
@@ -1,24 +1,145 @@
-from sqlalchemy import create_engine
+import time
+from typing import Dict, Type
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from backend.core.config import settings
 
-# Create database engine
+def async_database_url(url: str) -> str:
+    """Swap a sync driver URL for its asyncio driver (aiosqlite / asyncpg)"""
+    for prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+class PoolStats:
+    """Running totals of how long callers waited to check out a pooled connection"""
+
+    # Upper bounds (seconds) of the wait-time histogram buckets
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        for i, bound in enumerate(self.BUCKETS):
+            if wait <= bound:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+
+    def snapshot(self, pool: Pool) -> Dict:
+        labels = [f"<={bound}s" for bound in self.BUCKETS] + [f">{self.BUCKETS[-1]}s"]
+        snapshot = {
+            "pool": pool.status(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "wait_histogram": dict(zip(labels, self.bucket_counts)),
+        }
+        if isinstance(pool, QueuePool):
+            snapshot.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        return snapshot
+
+def _timed_pool(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """Pool subclass recording checkout wait times into ``stats``
+
+    A class attribute rather than instance state, so the stats survive the
+    pool being recreated on engine.dispose().
+    """
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"stats": stats, "connect": connect})
+
+def _engine_options(url: str, pool_class: Type[Pool]) -> Dict:
+    options = {"echo": settings.DEBUG}  # Log SQL queries in debug mode
+    # In-memory SQLite is per-connection, so leave its pooling to SQLAlchemy
+    if ":memory:" in url:
+        return options
+    options.update(
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers proceed during writes; busy_timeout waits instead of failing with 'database is locked'"""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+# Sync engine, kept for scripts, benchmarks and Alembic migrations
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    **_engine_options(settings.DATABASE_URL, _timed_pool(QueuePool, sync_pool_stats)),
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API so queries never block the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **_engine_options(settings.DATABASE_URL, _timed_pool(AsyncAdaptedQueuePool, async_pool_stats)),
+)
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _configure_sqlite)
+    event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create base class for models
 Base = declarative_base()
 
+def pool_status() -> Dict:
+    """Checkout wait-time stats for both engines, for sizing the pools"""
+    return {
+        "async": async_pool_stats.snapshot(async_engine.pool),
+        "sync": sync_pool_stats.snapshot(engine.pool),
+    }
+
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close() 
\ No newline at end of file
@@ -0,0 +1,149 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterator, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# LLM calls take seconds, so the default sub-second buckets don't fit them
+AI_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, until the last body byte is sent",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+AI_REQUEST_DURATION = Histogram(
+    "ai_request_duration_seconds",
+    "OpenAI chat completion latency by operation",
+    ["operation", "outcome"],
+    buckets=AI_BUCKETS,
+)
+AI_TOKENS = Counter(
+    "ai_tokens",
+    "OpenAI tokens by operation; streamed calls report estimates",
+    ["operation", "kind"],
+)
+AI_FALLBACKS = Counter(
+    "ai_fallbacks",
+    "Mock responses served because OpenAI was unavailable",
+    ["operation"],
+)
+NEWS_FETCH_DURATION = Histogram(
+    "news_fetch_duration_seconds",
+    "Upstream news feed fetch latency",
+    ["provider", "outcome"],
+)
+NEWS_ARTICLES_FETCHED = Counter(
+    "news_articles_fetched",
+    "Articles returned by upstream news feeds",
+    ["provider"],
+)
+
+def observe_ai_call(operation: str, started: float, outcome: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+    AI_REQUEST_DURATION.labels(operation, outcome).observe(time.perf_counter() - started)
+    if prompt_tokens:
+        AI_TOKENS.labels(operation, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        AI_TOKENS.labels(operation, "completion").inc(completion_tokens)
+
+class StatsCollector:
+    """Exposes the numeric values of services' stats dicts as gauges at scrape time"""
+
+    def __init__(self, prefix: str = "morning_news"):
+        self.prefix = prefix
+        self._sources: Dict[str, Callable[[], Dict]] = {}
+
+    def register(self, name: str, source: Callable[[], Dict]):
+        self._sources[name] = source
+
+    def _flatten(self, stats: Dict, prefix: str) -> Iterator[Tuple[str, float]]:
+        for key, value in stats.items():
+            name = f"{prefix}_{key}"
+            if isinstance(value, dict):
+                yield from self._flatten(value, name)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool) and name.replace("_", "a").isalnum():
+                yield name, value
+
+    def collect(self):
+        for source_name, source in self._sources.items():
+            try:
+                stats = source()
+            except Exception as e:
+                logger.error(f"Error collecting {source_name} stats: {e}")
+                continue
+            for name, value in self._flatten(stats, f"{self.prefix}_{source_name}"):
+                yield GaugeMetricFamily(name, f"{source_name} stat {name}", value=value)
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """The exposition text and its content type
+
+    With PROMETHEUS_MULTIPROC_DIR set (several workers), request, AI and
+    news metrics are aggregated across workers; service stats are only
+    available per worker then and are left out.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight requests per route template
+
+    Labels use the matched route's path (e.g. ``/api/news/article/{article_id}/summary``)
+    so IDs in URLs don't create new series. Streaming responses are timed
+    until they finish.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _route(self, scope) -> str:
+        partial = None
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                # Right path, wrong method; answered with a 405
+                partial = route.path
+        return partial or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route, str(status["code"])).observe(time.perf_counter() - started)
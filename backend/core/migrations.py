@@ -0,0 +1,39 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from backend.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Revision matching the schema that Base.metadata.create_all used to build
+BASELINE_REVISION = "0001"
+
+def alembic_config(database_url: str = None) -> Config:
+    """Alembic config pointing at our migrations, independent of the working directory"""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "backend" / "migrations"))
+    config.set_main_option("sqlalchemy.url", (database_url or settings.DATABASE_URL).replace("%", "%%"))
+    config.attributes["configure_logger"] = False
+    return config
+
+def run_migrations(database_url: str = None):
+    """Upgrade the database schema to the latest revision"""
+    database_url = database_url or settings.DATABASE_URL
+    config = alembic_config(database_url)
+    
+    # Databases created before migrations existed have tables but no version
+    engine = create_engine(database_url)
+    try:
+        tables = inspect(engine).get_table_names()
+    finally:
+        engine.dispose()
+    
+    if "articles" in tables and "alembic_version" not in tables:
+        logger.info(f"Stamping pre-migration database at revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    
+    command.upgrade(config, "head")
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, func, literal, or_, select
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+
+def _encode(payload: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def _decode(cursor: str) -> Dict[str, Any]:
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    if not isinstance(payload, dict):
+        raise ValueError("Cursor payload is not an object")
+    return payload
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Opaque cursor pointing just past the given (created_at, id) row"""
+    return _encode({"created_at": created_at.isoformat() if created_at else None, "id": row_id})
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = _decode(cursor)
+        created_at = payload["created_at"]
+        return {
+            "created_at": datetime.fromisoformat(created_at) if created_at else None,
+            "id": int(payload["id"]),
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_before(model, cursor: Dict[str, Any]):
+    """Filter for rows after ``cursor`` in ``created_at DESC, id DESC`` order
+
+    The boundary timestamp is read back from the cursor row itself so it
+    compares exactly as stored (SQLite keeps server-side timestamps as text
+    without microseconds); the encoded value is only used if that row is gone.
+    """
+    stored = select(model.created_at).where(model.id == cursor["id"]).scalar_subquery()
+    boundary = func.coalesce(stored, literal(cursor["created_at"], model.created_at.type))
+    return or_(
+        model.created_at < boundary,
+        and_(model.created_at == boundary, model.id < cursor["id"]),
+    )
+
+
+def encode_score_cursor(score: float, row_id: int) -> str:
+    """Opaque cursor pointing just past the given (score, id) row of a ranked result"""
+    return _encode({"score": score, "id": row_id})
+
+
+def decode_score_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = _decode(cursor)
+        return {"score": float(payload["score"]), "id": int(payload["id"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import create_engine, select, text, tuple_
+from sqlalchemy.sql import Select
+from backend.core.pagination import keyset_before
+from backend.models.models import Article, Conversation, Message, TrendingTerm, UserPreference
+
+def hot_queries() -> List[Tuple[str, Select]]:
+    """The queries on our request paths, as (name, SQLAlchemy statement)"""
+    return [
+        ("latest articles", select(Article).order_by(Article.created_at.desc()).limit(20)),
+        ("latest canonical articles", select(Article).where(Article.canonical_id.is_(None))
+            .order_by(Article.created_at.desc()).limit(20)),
+        ("articles by category", select(Article).where(Article.category == "business")
+            .order_by(Article.created_at.desc()).limit(20)),
+        ("articles page after cursor", select(Article.id, Article.title, Article.created_at).where(
+            keyset_before(Article, {"created_at": datetime(2026, 1, 1), "id": 5}))
+            .order_by(Article.created_at.desc(), Article.id.desc()).limit(21)),
+        ("distinct categories", select(Article.category).distinct()),
+        ("article by id", select(Article).where(Article.id == 1)),
+        ("ingestion dedup check", select(Article.source, Article.dedup_key).where(
+            tuple_(Article.source, Article.dedup_key).in_([("The Guardian", "abc")]))),
+        ("conversation by session", select(Conversation).where(Conversation.session_id == "abc")),
+        ("sessions by user", select(Conversation).where(Conversation.user_id == "abc")
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(21)),
+        ("sessions page after cursor", select(Conversation).where(
+            Conversation.user_id == "abc", keyset_before(Conversation, {"created_at": datetime(2026, 1, 1), "id": 5}))
+            .order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(21)),
+        ("conversation history", select(Message).where(Message.conversation_id == 1)
+            .order_by(Message.timestamp.desc()).limit(20)),
+        ("preferences by user", select(UserPreference).where(UserPreference.user_id == "abc")),
+        ("trending topics", select(TrendingTerm).order_by(TrendingTerm.log_score.desc()).limit(10)),
+    ]
+
+def query_plan_failures(database_url: str) -> List[str]:
+    """Hot queries whose plan on the given SQLite database includes a full table scan"""
+    engine = create_engine(database_url)
+    failures = []
+    try:
+        with engine.connect() as connection:
+            for name, statement in hot_queries():
+                sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+                plan = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+                # "SCAN t" is a full table scan; "SCAN t USING INDEX" walks an index in order
+                scans = [
+                    step for step in plan
+                    if step.startswith("SCAN") and "USING" not in step and "CONSTANT ROW" not in step
+                ]
+                if scans:
+                    failures.append(f"{name}: {'; '.join(plan)}")
+    finally:
+        engine.dispose()
+    return failures
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightError(Exception):
+    """Raised to followers when the leader in another worker failed"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution
+
+    The first caller for a key starts the work as a task and later callers
+    await the same task. Results and exceptions reach every waiter. A waiter
+    being cancelled doesn't cancel the shared work unless it was the last
+    one still waiting.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, fn))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["followers"] += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await fn()
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        # Mark the exception retrieved; the waiters already re-raised it
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict:
+        return {"in_flight": len(self._inflight), **self.stats}
+
+
+# Take the lock unless someone holds it; returns the holder's token either way
+ACQUIRE_LOCK = """
+local holder = redis.call('get', KEYS[1])
+if holder then return holder end
+redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return ARGV[1]
+"""
+
+# Extend or release the lock only while we still hold it
+EXTEND_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+return 0
+"""
+RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+
+
+class RedisSingleFlight(SingleFlight):
+    """SingleFlight that also coalesces across workers through Redis
+
+    Within a worker calls coalesce as usual. Across workers the first to
+    take a Redis lock runs ``fn``, extending the lock while it runs, and
+    publishes its JSON-serializable result (or error) under a key tied to
+    its lock token. Workers that found the lock held poll for that result,
+    so they get exactly that run's outcome; a caller arriving after the run
+    finished starts a new one. If the leader dies its lock expires after
+    ``lock_ttl`` and a waiting worker takes over. If Redis is unavailable
+    calls coalesce per worker only.
+    """
+
+    def __init__(self, namespace: str, url: str = None, lock_ttl: float = None, poll_interval: float = 0.05):
+        import redis.asyncio as redis
+        from redis.exceptions import RedisError
+
+        super().__init__(namespace)
+        self.client = redis.from_url(
+            url or settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+        self.errors = (RedisError, OSError)
+        self.lock_ttl = lock_ttl or settings.SINGLEFLIGHT_LOCK_TTL
+        self.poll_interval = poll_interval
+        self._acquire = self.client.register_script(ACQUIRE_LOCK)
+        self._extend = self.client.register_script(EXTEND_LOCK)
+        self._release = self.client.register_script(RELEASE_LOCK)
+
+    @property
+    def _lock_ttl_ms(self) -> int:
+        return int(self.lock_ttl * 1000)
+
+    def _result_key(self, key: str, token: str) -> str:
+        return f"singleflight:{self.namespace}:{key}:result:{token}"
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"singleflight:{self.namespace}:{key}:lock"
+        token = uuid.uuid4().hex
+        waiting_on = None
+
+        while True:
+            try:
+                # The run we've been waiting on may have finished and released its lock
+                if waiting_on is not None:
+                    raw = await self.client.get(self._result_key(key, waiting_on))
+                    if raw is not None:
+                        break
+                holder = await self._acquire(keys=[lock_key], args=[token, self._lock_ttl_ms])
+            except self.errors as e:
+                logger.warning(f"Redis unavailable for {self.namespace} single-flight, running in this worker only: {e}")
+                return await fn()
+
+            if holder == token:
+                return await self._lead(key, fn, lock_key, token)
+            waiting_on = holder
+            await asyncio.sleep(self.poll_interval)
+
+        outcome = json.loads(raw)
+        if "error" in outcome:
+            raise SingleFlightError(outcome["error"])
+        return outcome["value"]
+
+    async def _keep_lock(self, lock_key: str, token: str):
+        """Extend the lock every third of its TTL so a slow call isn't taken over"""
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                if not await self._extend(keys=[lock_key], args=[token, self._lock_ttl_ms]):
+                    logger.warning(f"Lost single-flight lock {lock_key} while running")
+                    return
+            except self.errors as e:
+                logger.warning(f"Could not extend single-flight lock {lock_key}: {e}")
+
+    async def _lead(self, key: str, fn, lock_key: str, token: str) -> Any:
+        keepalive = asyncio.create_task(self._keep_lock(lock_key, token))
+        outcome = None
+        try:
+            value = await fn()
+            outcome = {"value": value}
+            return value
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            outcome = {"error": str(e)}
+            raise
+        finally:
+            keepalive.cancel()
+            try:
+                # Kept for a lock TTL: followers poll far more often than that
+                if outcome is not None:
+                    await self.client.set(
+                        self._result_key(key, token), json.dumps(outcome, default=str), px=self._lock_ttl_ms
+                    )
+                await self._release(keys=[lock_key], args=[token])
+            except self.errors as e:
+                logger.warning(f"Could not publish single-flight result for {self.namespace}:{key}: {e}")
+
+
+def create_singleflight(namespace: str) -> SingleFlight:
+    """Build a single-flight group, shared across workers when CACHE_BACKEND is redis"""
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisSingleFlight(namespace)
+        except ImportError:
+            logger.warning("redis package not installed, coalescing requests per worker only")
+
+    return SingleFlight(namespace)
@@ -1,23 +1,62 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
 from backend.api.routes import news, chat, user
-from backend.core.database import engine, Base
 from backend.core.config import settings
+from backend.core.database import async_engine, pool_status
+from backend.core.metrics import MetricsMiddleware, render_metrics, stats_collector
+from backend.core.migrations import run_migrations
+from backend.services.briefing_service import briefing_service
+from backend.services.dedup_service import dedup_service
+from backend.services.ingestion_service import ingestion_service
+from backend.services.news_service import news_service
+from backend.services.personalized_briefing_service import personalized_briefing_service
+from backend.services.preference_service import preference_service
+from backend.services.response_cache_service import response_cache_service
+from backend.services.retrieval_service import retrieval_service
+from backend.services.summary_service import summary_service
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the database schema up to date
+    run_migrations()
+    
+    # In-memory indexes over stored articles: near-duplicate fingerprints
+    # and the offline relevance index for picking chat context
+    await dedup_service.rebuild()
+    await retrieval_service.rebuild()
+    retrieval_service.start()
+    
+    # One pooled HTTP client for all upstream news requests
+    await news_service.startup()
+    
+    # Keep the news table fresh in the background so requests only read from the DB
+    if settings.NEWS_REFRESH_ENABLED:
+        ingestion_service.start()
+    
+    # Generate users' briefings ahead of their briefing_time
+    if settings.PERSONALIZED_BRIEFING_ENABLED:
+        personalized_briefing_service.start()
+    yield
+    await personalized_briefing_service.stop()
+    await ingestion_service.stop()
+    await retrieval_service.stop()
+    await summary_service.shutdown()
+    await async_engine.dispose()
+    await news_service.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Morning News AI Assistant",
     description="A conversational morning news application with AI-powered insights",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -29,6 +68,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Services' own counters, read when /metrics is scraped
+stats_collector.register("db_pool", pool_status)
+stats_collector.register("ingestion", lambda: ingestion_service.status)
+stats_collector.register("personalized_briefing", lambda: personalized_briefing_service.status)
+stats_collector.register("chat_response_cache", response_cache_service.get_stats)
+stats_collector.register("preferences_cache", preference_service.get_stats)
+stats_collector.register("retrieval", lambda: retrieval_service.stats)
+stats_collector.register("singleflight", lambda: {
+    "briefing": briefing_service.flight.get_stats(),
+    "summary": summary_service.flight.get_stats(),
+    "personalized_briefing": personalized_briefing_service.flight.get_stats(),
+})
+
 # Include routers
 app.include_router(news.router, prefix="/api/news", tags=["news"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
@@ -42,6 +97,17 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "morning-news-api"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool state and checkout wait times"""
+    return pool_status()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request latency, LLM calls, news fetches and service stats"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,80 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from backend.core.config import settings
+from backend.core.database import Base
+from backend.models import models  # noqa: F401 - registers the tables on Base.metadata
+
+config = context.config
+
+# Only configure logging when invoked from the alembic CLI, not from the app
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+# Full-text search objects are created in raw SQL per dialect (see 0010) and
+# have no model, so autogenerate must not try to drop them
+FULL_TEXT_COLUMNS = {"search_vector"}
+FULL_TEXT_INDEXES = {"ix_articles_search_vector"}
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not name.startswith("articles_fts")
+    if type_ == "index":
+        return name not in FULL_TEXT_INDEXES
+    return True
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "column" and reflected and name in FULL_TEXT_COLUMNS)
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting to a database"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_name=include_name,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against a live connection"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can't ALTER most things in place; batch mode recreates the table
+            render_as_batch=True,
+            include_name=include_name,
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,82 @@
+"""Initial schema, matching the tables previously created by create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "articles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=500), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("summary", sa.Text(), nullable=True),
+        sa.Column("source", sa.String(length=100), nullable=True),
+        sa.Column("category", sa.String(length=50), nullable=True),
+        sa.Column("url", sa.String(length=1000), nullable=True),
+        sa.Column("published_at", sa.DateTime(), nullable=True),
+        sa.Column("sentiment", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_articles_id", "articles", ["id"], unique=False)
+
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=100), nullable=True),
+        sa.Column("session_id", sa.String(length=100), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_conversations_id", "conversations", ["id"], unique=False)
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("conversation_id", sa.Integer(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["conversation_id"], ["conversations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"], unique=False)
+
+    op.create_table(
+        "user_preferences",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=100), nullable=True),
+        sa.Column("preferred_categories", sa.Text(), nullable=True),
+        sa.Column("tone_preference", sa.String(length=50), nullable=True),
+        sa.Column("briefing_time", sa.String(length=10), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index("ix_user_preferences_id", "user_preferences", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_preferences_id", table_name="user_preferences")
+    op.drop_table("user_preferences")
+    op.drop_index("ix_messages_id", table_name="messages")
+    op.drop_table("messages")
+    op.drop_index("ix_conversations_id", table_name="conversations")
+    op.drop_table("conversations")
+    op.drop_index("ix_articles_id", table_name="articles")
+    op.drop_table("articles")
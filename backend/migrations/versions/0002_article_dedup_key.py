@@ -0,0 +1,71 @@
+"""Add articles.dedup_key with a unique (source, dedup_key) constraint
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:10:00
+
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of backend.services.text_utils.dedup_key as of this revision,
+# so the backfill doesn't change when the application's normalization does
+NON_WORD = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def _dedup_key(title: Optional[str], url: Optional[str]) -> str:
+    basis = ""
+    if title:
+        basis = unicodedata.normalize("NFKC", title).lower()
+        basis = WHITESPACE.sub(" ", NON_WORD.sub(" ", basis)).strip()
+    basis = basis or (url or "").strip().lower()
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.add_column(sa.Column("dedup_key", sa.String(length=40), nullable=True))
+
+    # Backfill existing rows; later copies of the same story keep a NULL key
+    # so the unique constraint can be created
+    articles = sa.table(
+        "articles",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("url", sa.String),
+        sa.column("source", sa.String),
+        sa.column("dedup_key", sa.String),
+    )
+    connection = op.get_bind()
+    seen = set()
+    rows = connection.execute(
+        sa.select(articles.c.id, articles.c.title, articles.c.url, articles.c.source).order_by(articles.c.id)
+    ).all()
+    for row in rows:
+        key = _dedup_key(row.title, row.url)
+        if (row.source, key) in seen:
+            continue
+        seen.add((row.source, key))
+        connection.execute(articles.update().where(articles.c.id == row.id).values(dedup_key=key))
+
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.create_unique_constraint("uq_articles_source_dedup_key", ["source", "dedup_key"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.drop_constraint("uq_articles_source_dedup_key", type_="unique")
+        batch_op.drop_column("dedup_key")
@@ -0,0 +1,33 @@
+"""Index the hot query paths for articles, conversations and messages
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_articles_created_at", "articles", ["created_at"], unique=False)
+    op.create_index("ix_articles_category_created_at", "articles", ["category", "created_at"], unique=False)
+    op.create_index("ix_conversations_session_id", "conversations", ["session_id"], unique=True)
+    op.create_index("ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"], unique=False)
+    op.create_index("ix_messages_conversation_id_timestamp", "messages", ["conversation_id", "timestamp"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_conversation_id_timestamp", table_name="messages")
+    op.drop_index("ix_conversations_user_id_created_at", table_name="conversations")
+    op.drop_index("ix_conversations_session_id", table_name="conversations")
+    op.drop_index("ix_articles_category_created_at", table_name="articles")
+    op.drop_index("ix_articles_created_at", table_name="articles")
@@ -0,0 +1,39 @@
+"""Add feed_cursors for incremental news fetching
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_cursors",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("provider", sa.String(length=50), nullable=False),
+        sa.Column("section", sa.String(length=50), nullable=False),
+        sa.Column("last_published_at", sa.DateTime(), nullable=True),
+        sa.Column("etag", sa.String(length=200), nullable=True),
+        sa.Column("last_modified", sa.String(length=100), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("provider", "section", name="uq_feed_cursors_provider_section"),
+    )
+    op.create_index("ix_feed_cursors_id", "feed_cursors", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_feed_cursors_id", table_name="feed_cursors")
+    op.drop_table("feed_cursors")
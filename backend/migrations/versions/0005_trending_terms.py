@@ -0,0 +1,42 @@
+"""Add trending_terms, the time-decayed topic index maintained at ingestion
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trending_terms",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("term", sa.String(length=200), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("log_score", sa.Float(), nullable=False),
+        sa.Column("article_count", sa.Integer(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("kind", "term", name="uq_trending_terms_kind_term"),
+    )
+    op.create_index("ix_trending_terms_id", "trending_terms", ["id"], unique=False)
+    op.create_index("ix_trending_terms_log_score", "trending_terms", ["log_score"], unique=False)
+    op.create_index("ix_trending_terms_last_seen_at", "trending_terms", ["last_seen_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trending_terms_last_seen_at", table_name="trending_terms")
+    op.drop_index("ix_trending_terms_log_score", table_name="trending_terms")
+    op.drop_index("ix_trending_terms_id", table_name="trending_terms")
+    op.drop_table("trending_terms")
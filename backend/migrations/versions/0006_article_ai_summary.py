@@ -0,0 +1,30 @@
+"""Persist AI article summaries with the content hash they were built from
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.add_column(sa.Column("ai_summary", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("ai_summary_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.drop_column("ai_summary_hash")
+        batch_op.drop_column("ai_summary")
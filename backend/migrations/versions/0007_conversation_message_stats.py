@@ -0,0 +1,49 @@
+"""Maintain message_count and last_message_at on conversations
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.add_column(sa.Column("message_count", sa.Integer(), server_default="0", nullable=False))
+        batch_op.add_column(sa.Column("last_message_at", sa.DateTime(), nullable=True))
+
+    # Backfill from existing messages
+    op.execute(
+        """
+        UPDATE conversations SET
+            message_count = (
+                SELECT COUNT(*) FROM messages WHERE messages.conversation_id = conversations.id
+            ),
+            last_message_at = (
+                SELECT MAX(timestamp) FROM messages WHERE messages.conversation_id = conversations.id
+            )
+        """
+    )
+
+    op.drop_index("ix_conversations_user_id_created_at", table_name="conversations")
+    op.create_index("ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversations_user_id_created_at", table_name="conversations")
+    op.create_index("ix_conversations_user_id_created_at", "conversations", ["user_id", "created_at"], unique=False)
+
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("last_message_at")
+        batch_op.drop_column("message_count")
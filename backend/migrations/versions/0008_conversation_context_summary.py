@@ -0,0 +1,30 @@
+"""Rolling summary of older turns on conversations
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.add_column(sa.Column("context_summary", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("summarized_through_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("summarized_through_id")
+        batch_op.drop_column("context_summary")
@@ -0,0 +1,115 @@
+"""Link near-duplicate articles to a canonical copy via SimHash
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 15:00:00
+
+"""
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the fingerprinting in backend.services.text_utils as of
+# this revision, so the backfill doesn't change when the application does.
+# The distance is a snapshot of NEAR_DUPLICATE_MAX_DISTANCE at the time, too.
+MAX_DISTANCE = 4
+MIN_FEATURES = 8
+NON_WORD = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+TAG = re.compile(r"<[^>]+>")
+
+
+def _normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return WHITESPACE.sub(" ", NON_WORD.sub(" ", text)).strip()
+
+
+def _simhash(text: Optional[str]) -> Optional[int]:
+    words = _normalize(TAG.sub(" ", text or "")).split()
+    features = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    if len(features) < MIN_FEATURES:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for feature in features
+    ]
+    return sum(
+        1 << bit for bit in range(64)
+        if sum((value >> bit) & 1 for value in hashes) * 2 > len(features)
+    )
+
+
+def _story_simhash(title: Optional[str], summary: Optional[str], content: Optional[str]) -> Optional[int]:
+    body = " ".join(text for text in (summary, (content or "")[:2000]) if text)
+    return _simhash(body) or _simhash(f"{title or ''} {body}")
+
+
+def _bands(fingerprint: int):
+    # MAX_DISTANCE + 1 bands: any match within the distance agrees on one of them
+    bands = MAX_DISTANCE + 1
+    width = 64 // bands
+    for band in range(bands):
+        end = 64 if band == bands - 1 else (band + 1) * width
+        yield band, (fingerprint >> (band * width)) & ((1 << (end - band * width)) - 1)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.add_column(sa.Column("simhash", sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column("canonical_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key("fk_articles_canonical_id", "articles", ["canonical_id"], ["id"])
+        batch_op.create_index("ix_articles_canonical_id", ["canonical_id"], unique=False)
+
+    # Fingerprint existing rows and link later copies to the first one stored
+    articles = sa.table(
+        "articles",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("summary", sa.Text),
+        sa.column("content", sa.Text),
+        sa.column("simhash", sa.BigInteger),
+        sa.column("canonical_id", sa.Integer),
+    )
+    connection = op.get_bind()
+    buckets = defaultdict(list)
+    rows = connection.execute(
+        sa.select(articles.c.id, articles.c.title, articles.c.summary, articles.c.content).order_by(articles.c.id)
+    ).all()
+    for row in rows:
+        fingerprint = _story_simhash(row.title, row.summary, row.content)
+        if fingerprint is None:
+            continue
+        canonical_id, best_distance = None, MAX_DISTANCE + 1
+        for bucket in _bands(fingerprint):
+            for candidate_id, candidate in buckets[bucket]:
+                distance = bin(fingerprint ^ candidate).count("1")
+                if distance < best_distance:
+                    canonical_id, best_distance = candidate_id, distance
+        if canonical_id is None:
+            for bucket in _bands(fingerprint):
+                buckets[bucket].append((row.id, fingerprint))
+        signed = fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+        connection.execute(
+            articles.update().where(articles.c.id == row.id).values(simhash=signed, canonical_id=canonical_id)
+        )
+
+def downgrade() -> None:
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.drop_index("ix_articles_canonical_id")
+        batch_op.drop_constraint("fk_articles_canonical_id", type_="foreignkey")
+        batch_op.drop_column("canonical_id")
+        batch_op.drop_column("simhash")
@@ -0,0 +1,83 @@
+"""Full-text search index on articles: FTS5 on SQLite, tsvector + GIN on PostgreSQL
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 09:00:00
+
+On SQLite the index is an external-content FTS5 table kept in sync by
+triggers. A later batch_alter_table("articles") that recreates the table
+drops those triggers, so such a migration must re-run SQLITE_TRIGGERS.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_fts_update AFTER UPDATE OF title, summary, content ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO articles_fts(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+# Title matches outrank description matches, which outrank body matches
+POSTGRES_SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce(title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+    || setweight(to_tsvector('english', left(coalesce(content, ''), 100000)), 'C')
+"""
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE articles_fts USING fts5("
+            "title, summary, content, content='articles', content_rowid='id', tokenize='porter unicode61')"
+        )
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(trigger)
+        op.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
+
+    elif dialect == "postgresql":
+        op.execute(
+            f"ALTER TABLE articles ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED"
+        )
+        op.create_index("ix_articles_search_vector", "articles", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for name in ("articles_fts_update", "articles_fts_delete", "articles_fts_insert"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS articles_fts")
+
+    elif dialect == "postgresql":
+        op.drop_index("ix_articles_search_vector", table_name="articles")
+        op.execute("ALTER TABLE articles DROP COLUMN search_vector")
@@ -0,0 +1,40 @@
+"""Add personalized_briefings, per-variant briefings generated ahead of briefing_time
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personalized_briefings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("variant_key", sa.String(length=40), nullable=False),
+        sa.Column("briefing_date", sa.Date(), nullable=False),
+        sa.Column("categories", sa.Text(), nullable=True),
+        sa.Column("tone", sa.String(length=50), nullable=True),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("article_ids", sa.Text(), nullable=True),
+        sa.Column("generated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("variant_key", "briefing_date", name="uq_personalized_briefings_variant_date"),
+    )
+    op.create_index("ix_personalized_briefings_id", "personalized_briefings", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_personalized_briefings_id", table_name="personalized_briefings")
+    op.drop_table("personalized_briefings")
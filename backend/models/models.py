@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Text, Date, DateTime, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.core.database import Base
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        UniqueConstraint("source", "dedup_key", name="uq_articles_source_dedup_key"),
+        # Category filter ordered by recency; also covers DISTINCT category
+        Index("ix_articles_category_created_at", "category", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False)
@@ -15,21 +20,39 @@ class Article(Base):
     url = Column(String(1000))
     published_at = Column(DateTime)
     sentiment = Column(Float)
-    created_at = Column(DateTime, server_default=func.now())
+    dedup_key = Column(String(40))  # SHA-1 of the normalized title (or URL)
+    ai_summary = Column(Text)  # Morning Brew-style summary generated by AIService
+    ai_summary_hash = Column(String(64))  # Content hash the ai_summary was generated from
+    simhash = Column(BigInteger)  # 64-bit SimHash of the body, stored signed
+    canonical_id = Column(Integer, ForeignKey("articles.id"), index=True)  # Set on near-duplicates
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Keyset pagination of a user's sessions by (created_at, id)
+        Index("ix_conversations_user_id_created_at", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String(100))
-    session_id = Column(String(100))
+    session_id = Column(String(100), unique=True, index=True)
     created_at = Column(DateTime, server_default=func.now())
+    # Maintained as messages are added so session lists never load messages
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_at = Column(DateTime)
+    # Rolling summary of every message up to and including summarized_through_id
+    context_summary = Column(Text)
+    summarized_through_id = Column(Integer)
     
     # Relationship to messages
     messages = relationship("Message", back_populates="conversation")
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_conversation_id_timestamp", "conversation_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
@@ -48,4 +71,47 @@ class UserPreference(Base):
     preferred_categories = Column(Text)  # JSON string of categories
     tone_preference = Column(String(50))  # 'casual', 'formal', 'humorous'
     briefing_time = Column(String(10))  # Time in HH:MM format
-    created_at = Column(DateTime, server_default=func.now()) 
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+class PersonalizedBriefing(Base):
+    __tablename__ = "personalized_briefings"
+    __table_args__ = (
+        UniqueConstraint("variant_key", "briefing_date", name="uq_personalized_briefings_variant_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    variant_key = Column(String(40), nullable=False)  # SHA-1 of the sorted categories and tone
+    briefing_date = Column(Date, nullable=False)  # Day of the briefing_time it was generated for
+    categories = Column(Text)  # JSON string of categories
+    tone = Column(String(50))
+    summary = Column(Text, nullable=False)
+    article_ids = Column(Text)  # JSON list of the articles shown with it, in order
+    generated_at = Column(DateTime, nullable=False)
+
+class FeedCursor(Base):
+    __tablename__ = "feed_cursors"
+    __table_args__ = (
+        UniqueConstraint("provider", "section", name="uq_feed_cursors_provider_section"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    provider = Column(String(50), nullable=False)  # 'newsapi' or 'guardian'
+    section = Column(String(50), nullable=False)
+    last_published_at = Column(DateTime)  # Newest publish time stored, in UTC
+    etag = Column(String(200))
+    last_modified = Column(String(100))
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class TrendingTerm(Base):
+    __tablename__ = "trending_terms"
+    __table_args__ = (
+        UniqueConstraint("kind", "term", name="uq_trending_terms_kind_term"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    term = Column(String(200), nullable=False)
+    kind = Column(String(20), nullable=False)  # 'term' or 'entity'
+    # Forward-decayed score stored as a log so ranking never needs rescaling
+    log_score = Column(Float, nullable=False, index=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime, nullable=False, index=True)
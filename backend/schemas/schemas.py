@@ -18,11 +18,24 @@ class ArticleCreate(ArticleBase):
 
 class Article(ArticleBase):
     id: int
+    ai_summary: Optional[str] = None
+    canonical_id: Optional[int] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+class ArticleSearchResult(BaseModel):
+    id: int
+    title: str
+    source: Optional[str] = None
+    category: Optional[str] = None
+    url: Optional[str] = None
+    published_at: Optional[datetime] = None
+    created_at: datetime
+    score: float
+    snippet: Optional[str] = None  # Matched text with <mark> highlights
+
 # Message schemas
 class MessageBase(BaseModel):
     content: str
@@ -1,15 +1,29 @@
-from openai import OpenAI
-from typing import List, Dict, Optional
+from openai import AsyncOpenAI
+from typing import AsyncIterator, Iterator, List, Dict, Optional
 from backend.core.config import settings
+from backend.core.metrics import AI_FALLBACKS, observe_ai_call
 from backend.schemas.schemas import Article, Message
+import asyncio
+import json
 import logging
 import random
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+def estimate_tokens(text: str) -> int:
+    """Rough token count for prompt budgeting (~4 characters per token for English)"""
+    return len(text or "") // 4 + 1
+
 class AIService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+        )
         self.model = settings.OPENAI_MODEL
         self.max_tokens = settings.MAX_TOKENS
         self.temperature = settings.TEMPERATURE
@@ -30,6 +44,26 @@ class AIService:
 
 Remember: You're helping someone start their day with the news, so be energetic, insightful, and genuinely helpful. Think Morning Brew newsletter meets friendly conversation."""
 
+    def _timeout(self, timeout: Optional[float]) -> float:
+        """Resolve a per-call timeout, falling back to the configured default"""
+        return timeout if timeout is not None else settings.OPENAI_TIMEOUT
+
+    async def _complete(self, operation: str, **kwargs):
+        """One chat completion, with its latency and token usage recorded for /metrics"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.chat.completions.create(model=self.model, **kwargs)
+        except Exception:
+            observe_ai_call(operation, started, "error")
+            raise
+        usage = response.usage
+        observe_ai_call(
+            operation, started, "ok",
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0
+        )
+        return response
+
     def _get_mock_response(self, message_type: str, user_message: str = "", articles: List[Article] = None) -> str:
         """Generate mock responses for testing when OpenAI API is unavailable"""
         
@@ -65,8 +99,13 @@ What catches your eye from today's news? I'm here to dive deeper into any of the
         
         return "I'm here to chat about today's news! What would you like to know? ☕"
 
-    def generate_morning_briefing(self, articles: List[Article]) -> str:
-        """Generate a Morning Brew-style briefing from articles"""
+    async def generate_morning_briefing(self, articles: List[Article], timeout: Optional[float] = None, fallback: bool = True, tone: Optional[str] = None) -> str:
+        """Generate a Morning Brew-style briefing from articles
+        
+        With ``fallback=False`` OpenAI errors are raised instead of being
+        replaced by the mock briefing, so callers can avoid caching it.
+        ``tone`` is a user's tone preference, e.g. 'professional'.
+        """
         if not articles:
             return "Good morning! I don't have any fresh news to share right now, but I'm here to chat about whatever's on your mind! ☕"
         
@@ -79,6 +118,7 @@ What catches your eye from today's news? I'm here to dive deeper into any of the
                 article_summaries.append(summary)
             
             articles_text = "\n\n".join(article_summaries)
+            tone_text = f"\n\nUse a {tone} tone throughout." if tone else ""
             
             briefing_prompt = f"""Create a Morning Brew-style news briefing from these articles. Make it engaging, conversational, and informative. Include:
 
@@ -90,69 +130,199 @@ What catches your eye from today's news? I'm here to dive deeper into any of the
 Articles:
 {articles_text}
 
-Write this as if you're chatting with a friend over coffee. Be engaging, insightful, and don't be afraid to add personality!"""
+Write this as if you're chatting with a friend over coffee. Be engaging, insightful, and don't be afraid to add personality!{tone_text}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._complete(
+                "briefing",
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": briefing_prompt}
                 ],
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                timeout=self._timeout(timeout)
             )
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Error generating briefing with OpenAI: {e}")
+            if not fallback:
+                raise
             # Fall back to mock response
-            return self._get_mock_response("briefing", articles=articles)
+            return self.fallback_briefing(articles)
+
+    def fallback_briefing(self, articles: List[Article]) -> str:
+        """Briefing served when OpenAI is unavailable"""
+        AI_FALLBACKS.labels("briefing").inc()
+        return self._get_mock_response("briefing", articles=articles)
+
+    def news_context_line(self, article: Article) -> str:
+        """How one article appears in the chat prompt's news context"""
+        return f"- {article.title} ({article.source}): {(article.summary or '')[:100]}...\n"
 
-    def chat_response(self, message: str, conversation_history: List[Message] = None, articles: List[Article] = None) -> str:
-        """Generate a conversational response to user message"""
+    def _build_chat_messages(self, message: str, conversation_history: List[Message] = None, articles: List[Article] = None, context_summary: Optional[str] = None) -> List[Dict]:
+        """Assemble the chat completion messages for a user turn
+        
+        ``conversation_history`` is oldest first and already trimmed to the
+        prompt budget; ``context_summary`` stands in for the turns before it.
+        """
+        # Build conversation context
+        messages = [{"role": "system", "content": self.system_prompt}]
+        
+        # Earlier turns, condensed
+        if context_summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{context_summary}"})
+        
+        # Add recent conversation history
+        if conversation_history:
+            for msg in conversation_history:
+                messages.append({
+                    "role": msg.role,
+                    "content": msg.content
+                })
+        
+        # Add current news context if available
+        if articles:
+            news_context = "Current news context:\n"
+            for article in articles[:5]:  # Top 5 articles for context
+                news_context += self.news_context_line(article)
+            
+            context_message = f"Here's some current news context to help inform your responses:\n\n{news_context}\n\nNow respond to the user's message."
+            messages.append({"role": "system", "content": context_message})
+        
+        # Add user message
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def fallback_chat_response(self, message: str, articles: List[Article] = None) -> str:
+        """Chat reply served when OpenAI is unavailable"""
+        AI_FALLBACKS.labels("chat").inc()
+        return self._get_mock_response("chat", message, articles)
+
+    def stream_words(self, text: str) -> Iterator[str]:
+        """Split text into word and whitespace chunks, for streaming a complete reply"""
+        for word in re.split(r"(\s+)", text):
+            if word:
+                yield word
+
+    async def chat_response(self, message: str, conversation_history: List[Message] = None, articles: List[Article] = None, timeout: Optional[float] = None, context_summary: Optional[str] = None, fallback: bool = True) -> str:
+        """Generate a conversational response to user message
+        
+        With ``fallback=False`` OpenAI errors are raised instead of returning
+        a mock reply, so callers can avoid caching it.
+        """
         
         # First try OpenAI
         try:
-            # Build conversation context
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add recent conversation history
-            if conversation_history:
-                for msg in conversation_history[-10:]:  # Last 10 messages for context
-                    messages.append({
-                        "role": msg.role,
-                        "content": msg.content
-                    })
-            
-            # Add current news context if available
-            if articles:
-                news_context = "Current news context:\n"
-                for article in articles[:5]:  # Top 5 articles for context
-                    news_context += f"- {article.title} ({article.source}): {article.summary[:100]}...\n"
-                
-                context_message = f"Here's some current news context to help inform your responses:\n\n{news_context}\n\nNow respond to the user's message."
-                messages.append({"role": "system", "content": context_message})
-            
-            # Add user message
-            messages.append({"role": "user", "content": message})
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
+            messages = self._build_chat_messages(message, conversation_history, articles, context_summary)
+            
+            response = await self._complete(
+                "chat",
                 messages=messages,
                 max_tokens=self.max_tokens,
-                temperature=self.temperature
+                temperature=self.temperature,
+                timeout=self._timeout(timeout)
             )
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Error generating chat response with OpenAI: {e}")
+            if not fallback:
+                raise
             # Fall back to mock response
-            return self._get_mock_response("chat", message, articles)
+            return self.fallback_chat_response(message, articles)
+
+    async def stream_chat_response(self, message: str, conversation_history: List[Message] = None, articles: List[Article] = None, timeout: Optional[float] = None, context_summary: Optional[str] = None, fallback: bool = True) -> AsyncIterator[str]:
+        """Stream a conversational response to user message token by token
+        
+        With ``fallback=False`` OpenAI errors are raised instead of streaming
+        a mock reply.
+        """
+        streamed_any = False
+        started = time.perf_counter()
+        outcome, messages, completion_tokens = "cancelled", [], 0
+        
+        try:
+            messages = self._build_chat_messages(message, conversation_history, articles, context_summary)
+            
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                timeout=self._timeout(timeout),
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if token:
+                    streamed_any = True
+                    completion_tokens += 1
+                    yield token
+            outcome = "ok"
+                    
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Error streaming chat response with OpenAI: {e}")
+            if not fallback:
+                raise
+            # Only fall back if nothing reached the client yet, otherwise the
+            # mock text would be appended to a partial real answer
+            if not streamed_any:
+                for word in self.stream_words(self.fallback_chat_response(message, articles)):
+                    yield word
+        
+        finally:
+            # Streams carry no usage, so count the prompt estimate and one token per chunk
+            prompt_tokens = sum(estimate_tokens(msg["content"]) for msg in messages) if streamed_any else 0
+            observe_ai_call("chat", started, outcome, prompt_tokens, completion_tokens)
+
+    async def summarize_conversation(self, previous_summary: Optional[str], messages: List[Message], max_tokens: int = 300, timeout: Optional[float] = None) -> str:
+        """Fold older chat turns into a running summary of the conversation
+        
+        Errors are raised rather than mocked, so a failed update leaves the
+        stored summary untouched.
+        """
+        transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in messages)
+        prompt = f"""Update the running summary of a conversation between a user and a news assistant.
+
+Current summary:
+{previous_summary or "(none yet)"}
+
+New turns to fold in:
+{transcript}
+
+Write the updated summary in at most {max_tokens * 3 // 4} words. Keep the stories, facts, names and user interests or preferences mentioned, and drop small talk. Respond with only the summary."""
 
-    def summarize_article(self, article: Article) -> str:
-        """Generate a concise, engaging summary of an article"""
+        response = await self._complete(
+            "conversation_summary",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=0.2,
+            timeout=self._timeout(timeout)
+        )
+        
+        summary = (response.choices[0].message.content or "").strip()
+        if not summary:
+            raise ValueError("Empty conversation summary")
+        return summary
+
+    def fallback_summary(self, article: Article) -> str:
+        """Summary served when OpenAI is unavailable"""
+        AI_FALLBACKS.labels("summary").inc()
+        return article.summary or "This story is developing, and there's definitely more to unpack here. The key details are still emerging, but it's worth keeping an eye on how this unfolds!"
+
+    async def summarize_article(self, article: Article, timeout: Optional[float] = None, fallback: bool = True) -> str:
+        """Generate a concise, engaging summary of an article
+        
+        With ``fallback=False`` OpenAI errors are raised instead of returning
+        the article's own description, so callers can avoid persisting it.
+        """
         
         try:
             prompt = f"""Summarize this news article in 2-3 sentences with a Morning Brew style - conversational, engaging, and informative:
@@ -163,23 +333,142 @@ Source: {article.source}
 
 Make it sound like you're explaining it to a friend over coffee."""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._complete(
+                "summary",
                 messages=[
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=150,
-                temperature=self.temperature
+                temperature=self.temperature,
+                timeout=self._timeout(timeout)
             )
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"Error summarizing article with OpenAI: {e}")
-            return article.summary or "This story is developing, and there's definitely more to unpack here. The key details are still emerging, but it's worth keeping an eye on how this unfolds!"
+            if not fallback:
+                raise
+            return self.fallback_summary(article)
+
+    def _pack_summary_batches(self, articles: List[Article], token_budget: int, max_articles: int) -> List[List[Article]]:
+        """Greedily group articles so each request's article text stays within the token budget"""
+        batches, current, used = [], [], 0
+        for article in articles:
+            cost = estimate_tokens(self._summary_batch_entry(article))
+            if current and (used + cost > token_budget or len(current) >= max_articles):
+                batches.append(current)
+                current, used = [], 0
+            current.append(article)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
 
-    def extract_key_topics(self, articles: List[Article]) -> List[str]:
+    def _summary_batch_entry(self, article: Article) -> str:
+        return f"""[id={article.id}]
+Title: {article.title}
+Content: {(article.content or article.summary or "")[:1000]}...
+Source: {article.source}"""
+
+    async def _summarize_batch(self, articles: List[Article], timeout: Optional[float] = None) -> Dict[int, str]:
+        """One completion request summarizing several articles; returns the summaries that parsed"""
+        articles_text = "\n\n".join(self._summary_batch_entry(article) for article in articles)
+        prompt = f"""Summarize each of these news articles in 2-3 sentences with a Morning Brew style - conversational, engaging, and informative. Make each one sound like you're explaining it to a friend over coffee.
+
+{articles_text}
+
+Respond with only a JSON array, one object per article, using the ids given above:
+[{{"id": <id>, "summary": "<summary>"}}]"""
+
+        response = await self._complete(
+            "summary_batch",
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150 * len(articles),
+            temperature=self.temperature,
+            timeout=self._timeout(timeout)
+        )
+        
+        text = response.choices[0].message.content or ""
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end < start:
+            raise ValueError("No JSON array in batch summary response")
+        
+        wanted = {article.id for article in articles}
+        summaries = {}
+        for item in json.loads(text[start:end + 1]):
+            # Skip malformed entries; their articles are retried on their own
+            if not isinstance(item, dict):
+                continue
+            try:
+                article_id = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            summary = item.get("summary")
+            if article_id in wanted and isinstance(summary, str) and summary.strip():
+                summaries[article_id] = summary.strip()
+        return summaries
+
+    async def summarize_articles(
+        self,
+        articles: List[Article],
+        token_budget: Optional[int] = None,
+        max_articles: Optional[int] = None,
+        concurrency: int = 4,
+        max_retries: int = 2,
+        timeout: Optional[float] = None,
+    ) -> Dict[int, str]:
+        """Summarize many articles, packing several into each completion request
+        
+        Returns summaries keyed by article ID. Articles whose summary failed
+        to parse are retried, up to ``max_retries`` times. A batch whose
+        request failed outright isn't retried here, since the client has
+        already retried it and more calls won't help during an outage. Any
+        articles left without a summary are left out so the caller can
+        decide what to do.
+        """
+        token_budget = token_budget or settings.SUMMARY_BATCH_TOKEN_BUDGET
+        max_articles = max_articles or settings.SUMMARY_BATCH_MAX_ARTICLES
+        semaphore = asyncio.Semaphore(concurrency)
+        pending = {article.id: article for article in articles}
+        results = {}
+        
+        async def run(batch: List[Article]) -> Optional[Dict[int, str]]:
+            async with semaphore:
+                try:
+                    return await self._summarize_batch(batch, timeout)
+                except ValueError as e:
+                    logger.warning(f"Unparseable batch summary for {len(batch)} articles: {e}")
+                    return {}
+                except Exception as e:
+                    logger.error(f"Error batch summarizing {len(batch)} articles with OpenAI: {e}")
+                    return None
+        
+        for attempt in range(max_retries + 1):
+            if not pending:
+                break
+            batches = self._pack_summary_batches(list(pending.values()), token_budget, max_articles)
+            for batch, summaries in zip(batches, await asyncio.gather(*[run(batch) for batch in batches])):
+                if summaries is None:
+                    # Request failed: give up on the whole batch
+                    for article in batch:
+                        pending.pop(article.id, None)
+                    continue
+                for article_id, summary in summaries.items():
+                    if article_id in pending:
+                        results[article_id] = summary
+                        del pending[article_id]
+        
+        missing = len(articles) - len(results)
+        if missing:
+            logger.warning(f"Batch summarization gave up on {missing} articles")
+        return results
+
+    async def extract_key_topics(self, articles: List[Article], timeout: Optional[float] = None) -> List[str]:
         """Extract key topics from a list of articles"""
         if not articles:
             return []
@@ -193,14 +482,15 @@ Make it sound like you're explaining it to a friend over coffee."""
 
 Topics:"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = await self._complete(
+                "topics",
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that extracts key topics from news articles."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=200,
-                temperature=0.3
+                temperature=0.3,
+                timeout=self._timeout(timeout)
             )
             
             topics_text = response.choices[0].message.content
@@ -211,6 +501,7 @@ Topics:"""
         except Exception as e:
             logger.error(f"Error extracting topics with OpenAI: {e}")
             # Return categories from articles as fallback
+            AI_FALLBACKS.labels("topics").inc()
             return list(set([article.category for article in articles[:10] if article.category]))
 
 # Global instance
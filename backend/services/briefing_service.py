@@ -0,0 +1,51 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+from backend.core.cache import create_cache, fingerprint
+from backend.core.singleflight import create_singleflight
+from backend.schemas.schemas import Article
+from backend.services.ai_service import ai_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+# generate_morning_briefing only puts this many articles into the prompt
+BRIEFING_PROMPT_ARTICLES = 10
+
+class BriefingService:
+    def __init__(self):
+        self.cache = create_cache("briefing")
+        self.flight = create_singleflight("briefing")
+    
+    def cache_key(self, articles: List[Article]) -> str:
+        """Fingerprint of the article IDs that feed the briefing prompt, in prompt order"""
+        return fingerprint((article.id for article in articles[:BRIEFING_PROMPT_ARTICLES]), ordered=True)
+    
+    async def get_briefing(self, articles: List[Article]) -> Tuple[str, datetime]:
+        """Return the briefing text for these articles and when it was generated"""
+        key = self.cache_key(articles)
+        
+        cached = await self.cache.get(key)
+        if not cached:
+            # Concurrent requests for the same articles share one generation
+            cached = await self.flight.do(key, lambda: self._generate(articles, key))
+        return cached["summary"], datetime.fromisoformat(cached["generated_at"])
+    
+    async def _generate(self, articles: List[Article], key: str) -> Dict:
+        generated_at = datetime.now().isoformat()
+        try:
+            summary = await ai_service.generate_morning_briefing(articles, fallback=False)
+        except Exception:
+            # Serve the fallback but don't cache it, so the next request retries OpenAI
+            return {"summary": ai_service.fallback_briefing(articles), "generated_at": generated_at}
+        
+        briefing = {"summary": summary, "generated_at": generated_at}
+        await self.cache.set(key, briefing)
+        return briefing
+    
+    async def invalidate(self):
+        """Drop every cached briefing, e.g. after new articles are stored"""
+        await self.cache.clear()
+        logger.info("Briefing cache invalidated")
+
+# Global instance
+briefing_service = BriefingService()
@@ -0,0 +1,114 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.models.models import Conversation, Message
+from backend.schemas.schemas import Message as MessageSchema
+from backend.services.ai_service import ai_service, estimate_tokens
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on unsummarized messages read for one prompt
+MAX_HISTORY_MESSAGES = 50
+
+@dataclass
+class ChatContext:
+    """What a chat prompt carries about the conversation so far"""
+    summary: Optional[str] = None
+    history: List[MessageSchema] = field(default_factory=list)  # Oldest first
+
+class ContextService:
+    """Keeps chat prompts bounded with a rolling per-conversation summary of older turns"""
+
+    def __init__(self):
+        self.token_budget = settings.CHAT_HISTORY_TOKEN_BUDGET
+        self.recent_messages = settings.CHAT_RECENT_TURNS * 2
+        self.summarize_every = settings.CHAT_SUMMARIZE_EVERY_TURNS * 2
+        self.summary_max_tokens = settings.CHAT_SUMMARY_MAX_TOKENS
+        self._updating: Set[int] = set()
+
+    async def _unsummarized(self, db: AsyncSession, conversation: Conversation, limit: int, newest: bool) -> List[Message]:
+        """Messages not yet folded into the summary, oldest first"""
+        query = select(Message).where(Message.conversation_id == conversation.id)
+        if conversation.summarized_through_id:
+            query = query.where(Message.id > conversation.summarized_through_id)
+        query = query.order_by(Message.id.desc() if newest else Message.id).limit(limit)
+        
+        result = await db.execute(query)
+        messages = result.scalars().all()
+        return list(reversed(messages)) if newest else list(messages)
+
+    def fit_to_budget(self, messages: List[MessageSchema], token_budget: int) -> List[MessageSchema]:
+        """Keep the newest messages that fit in ``token_budget``"""
+        kept, used = [], 0
+        for message in reversed(messages):
+            used += estimate_tokens(message.content)
+            if used > token_budget:
+                break
+            kept.append(message)
+        return list(reversed(kept))
+
+    async def build(self, db: AsyncSession, conversation: Conversation) -> ChatContext:
+        """Summary plus as many recent verbatim turns as the token budget allows"""
+        messages = await self._unsummarized(db, conversation, MAX_HISTORY_MESSAGES, newest=True)
+        budget = self.token_budget - estimate_tokens(conversation.context_summary)
+        return ChatContext(
+            summary=conversation.context_summary,
+            history=self.fit_to_budget([MessageSchema.from_orm(msg) for msg in messages], budget),
+        )
+
+    async def refresh(self, conversation_id: int):
+        """Fold older turns into the summary once enough have piled up
+        
+        Meant to run as a background task after a reply is saved. The AI call
+        happens outside any DB session, and the write only lands if nobody
+        else advanced the summary in the meantime.
+        """
+        if conversation_id in self._updating:
+            return
+        self._updating.add(conversation_id)
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                conversation = await db.get(Conversation, conversation_id)
+                if conversation is None:
+                    return
+                # Long backlogs (e.g. sessions from before summaries existed) are folded a chunk per turn
+                limit = self.recent_messages + self.summarize_every * 4
+                messages = await self._unsummarized(db, conversation, limit, newest=False)
+            
+            if len(messages) < self.recent_messages + self.summarize_every:
+                return
+            
+            to_fold = messages[:len(messages) - self.recent_messages]
+            summary = await ai_service.summarize_conversation(
+                conversation.context_summary,
+                [MessageSchema.from_orm(msg) for msg in to_fold],
+                max_tokens=self.summary_max_tokens,
+            )
+            
+            previous_through = conversation.summarized_through_id
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Conversation)
+                    .where(
+                        Conversation.id == conversation_id,
+                        Conversation.summarized_through_id.is_(None) if previous_through is None
+                        else Conversation.summarized_through_id == previous_through,
+                    )
+                    .values(context_summary=summary, summarized_through_id=to_fold[-1].id)
+                )
+                await db.commit()
+            logger.info(f"Folded {len(to_fold)} messages into the summary of conversation {conversation_id}")
+            
+        except Exception as e:
+            logger.error(f"Error updating summary of conversation {conversation_id}: {e}")
+        
+        finally:
+            self._updating.discard(conversation_id)
+
+# Global instance
+context_service = ContextService()
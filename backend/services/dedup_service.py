@@ -0,0 +1,104 @@
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.models.models import Article
+from backend.services.text_utils import SimHashIndex, signed64, story_simhash
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DedupService:
+    """Links near-duplicate stories to the first stored copy using SimHash fingerprints
+
+    Each worker keeps an index of canonical fingerprints. Before linking it
+    catches up on canonical articles other workers stored, and it only adds
+    entries for articles whose links were committed.
+    """
+
+    def __init__(self):
+        self.index = SimHashIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE)
+        self._indexed: Set[int] = set()
+        self.last_id = 0
+
+    def fingerprint(self, title: Optional[str], summary: Optional[str], content: Optional[str]) -> Optional[int]:
+        """Fingerprint as stored in ``Article.simhash``"""
+        fingerprint = story_simhash(title, summary, content)
+        return signed64(fingerprint) if fingerprint is not None else None
+
+    def add(self, articles: Iterable[Article]):
+        """Index canonical articles; call once their rows are committed"""
+        for article in articles:
+            if article.simhash is not None and article.id not in self._indexed:
+                self.index.add(article.id, article.simhash)
+                self._indexed.add(article.id)
+
+    async def _catch_up(self, db: AsyncSession, exclude: Set[int] = frozenset()):
+        """Index canonical articles stored since the last load, e.g. by other workers"""
+        result = await db.stream(
+            select(Article.id, Article.simhash)
+            .where(
+                Article.canonical_id.is_(None),
+                Article.simhash.is_not(None),
+                Article.id > self.last_id,
+            )
+            .order_by(Article.id)
+        )
+        last_id = self.last_id
+        async for row in result:
+            last_id = row.id
+            if row.id not in exclude:
+                self.add([row])
+        if exclude:
+            # Reread the articles being linked next time, in case their links are never committed
+            last_id = min(last_id, min(exclude) - 1)
+        self.last_id = last_id
+
+    async def rebuild(self):
+        """Index the fingerprints of every canonical article, e.g. at startup"""
+        self.index = SimHashIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE)
+        self._indexed = set()
+        self.last_id = 0
+        async with AsyncSessionLocal() as db:
+            await self._catch_up(db)
+        logger.info(f"Indexed {self.index.size} article fingerprints for near-duplicate detection")
+
+    async def link(self, db: AsyncSession, articles: List[Article]) -> List[Article]:
+        """Point new near-duplicates at their canonical article; returns the canonical ones
+        
+        Caller commits, then passes the canonical articles to ``add``.
+        Articles are processed in ID order so copies within one batch link to
+        the earliest of them.
+        """
+        await self._catch_up(db, exclude={article.id for article in articles})
+        
+        batch = SimHashIndex(settings.NEAR_DUPLICATE_MAX_DISTANCE)
+        canonical, linked = [], []
+        for article in sorted(articles, key=lambda article: article.id):
+            if article.simhash is not None:
+                match = self.index.find(article.simhash)
+                if match is None:
+                    match = batch.find(article.simhash)
+                if match is not None and match != article.id:
+                    article.canonical_id = match
+                    linked.append(article)
+                    continue
+                batch.add(article.id, article.simhash)
+            canonical.append(article)
+        
+        if linked:
+            # A match stored by another worker may since have been linked to an earlier copy
+            result = await db.execute(
+                select(Article.id, Article.canonical_id).where(
+                    Article.id.in_([article.canonical_id for article in linked]),
+                    Article.canonical_id.is_not(None),
+                )
+            )
+            relinked = dict(result.all())
+            for article in linked:
+                article.canonical_id = relinked.get(article.canonical_id, article.canonical_id)
+        return canonical
+
+# Global instance
+dedup_service = DedupService()
@@ -0,0 +1,232 @@
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.models.models import Article, FeedCursor
+from backend.schemas.schemas import ArticleCreate
+from backend.services.news_service import CursorState, news_service
+from backend.services.briefing_service import briefing_service
+from backend.services.dedup_service import dedup_service
+from backend.services.retrieval_service import retrieval_service
+from backend.services.summary_service import summary_service
+from backend.services.text_utils import dedup_key
+from backend.services.trending_service import trending_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IngestionService:
+    """Fetches news from upstream sources and stores it, on demand or on a schedule"""
+
+    def __init__(self):
+        self.interval = settings.NEWS_REFRESH_INTERVAL
+        self.jitter = settings.NEWS_REFRESH_JITTER
+        self.batch_size = settings.INGEST_BATCH_SIZE
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.status = {
+            "scheduler_running": False,
+            "in_progress": False,
+            "runs": 0,
+            "last_started_at": None,
+            "last_finished_at": None,
+            "last_duration_seconds": None,
+            "last_result": None,
+            "last_error": None,
+            "next_run_at": None,
+        }
+
+    async def save_articles(self, db: AsyncSession, articles: List[ArticleCreate]) -> Dict:
+        """Store articles that aren't already in the database
+        
+        Duplicates are detected per (source, dedup_key) in one set-based
+        statement per batch rather than one query per article.
+        """
+        # Collapse duplicates inside the fetched batch itself
+        rows = {}
+        for article_data in articles:
+            row = article_data.dict()
+            row["dedup_key"] = dedup_key(article_data.title, article_data.url)
+            row["simhash"] = dedup_service.fingerprint(article_data.title, article_data.summary, article_data.content)
+            rows.setdefault((row["source"], row["dedup_key"]), row)
+        
+        rows = list(rows.values())
+        saved_ids = []
+        for start in range(0, len(rows), self.batch_size):
+            saved_ids.extend(await self._insert_new(db, rows[start:start + self.batch_size]))
+        
+        await db.commit()
+        return {
+            "fetched": len(articles),
+            "saved": len(saved_ids),
+            "duplicates": len(articles) - len(saved_ids),
+            "saved_ids": saved_ids,
+        }
+
+    async def _insert_new(self, db: AsyncSession, rows: List[Dict]) -> List[int]:
+        """Insert rows, skipping existing (source, dedup_key) pairs; returns new IDs"""
+        if not rows:
+            return []
+        
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            
+            stmt = (
+                insert(Article)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["source", "dedup_key"])
+                .returning(Article.id)
+            )
+            result = await db.execute(stmt)
+            return list(result.scalars())
+        
+        # Other databases: one batched existence check, then insert the rest
+        result = await db.execute(
+            select(Article.source, Article.dedup_key).where(
+                tuple_(Article.source, Article.dedup_key).in_(
+                    [(row["source"], row["dedup_key"]) for row in rows]
+                )
+            )
+        )
+        existing = set(result.all())
+        new_articles = [Article(**row) for row in rows if (row["source"], row["dedup_key"]) not in existing]
+        db.add_all(new_articles)
+        await db.flush()
+        return [article.id for article in new_articles]
+
+    async def load_cursors(self, db: AsyncSession) -> Dict[Tuple[str, str], CursorState]:
+        """Per-feed high-water marks from previous runs"""
+        result = await db.execute(select(FeedCursor))
+        return {
+            (row.provider, row.section): CursorState(
+                last_published_at=row.last_published_at,
+                etag=row.etag,
+                last_modified=row.last_modified,
+            )
+            for row in result.scalars()
+        }
+
+    async def save_cursors(self, db: AsyncSession, cursors: Dict[Tuple[str, str], CursorState]):
+        """Persist advanced high-water marks; call only after the articles are stored"""
+        result = await db.execute(select(FeedCursor))
+        rows = {(row.provider, row.section): row for row in result.scalars()}
+        for (provider, section), cursor in cursors.items():
+            row = rows.get((provider, section))
+            if row is None:
+                row = FeedCursor(provider=provider, section=section)
+                db.add(row)
+            row.last_published_at = cursor.last_published_at
+            row.etag = cursor.etag
+            row.last_modified = cursor.last_modified
+        await db.commit()
+
+    async def _persist(self, articles: List[ArticleCreate], cursors: Dict[Tuple[str, str], CursorState]) -> Dict:
+        """Save articles, then advance the feed cursors, near-duplicate links and the trending index"""
+        async with AsyncSessionLocal() as db:
+            saved = await self.save_articles(db, articles)
+            await self.save_cursors(db, cursors)
+            
+            if saved["saved_ids"]:
+                result = await db.execute(select(Article).where(Article.id.in_(saved["saved_ids"])))
+                # Near-duplicates of stories we already have don't count twice
+                canonical = await dedup_service.link(db, result.scalars().all())
+                await db.commit()
+                dedup_service.add(canonical)
+                saved["near_duplicates"] = len(saved["saved_ids"]) - len(canonical)
+                await trending_service.update(db, canonical)
+                retrieval_service.add_articles(canonical)
+            return saved
+
+    async def run_once(self) -> Dict:
+        """Fetch and store news from all sources; concurrent calls share one run at a time"""
+        async with self._lock:
+            started = time.perf_counter()
+            self.status["in_progress"] = True
+            self.status["last_started_at"] = datetime.now()
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    cursors = await self.load_cursors(db)
+                articles = await news_service.fetch_all_news(cursors)
+                saved = await self._persist(articles, cursors)
+
+                # New articles change what the briefing should cover
+                if saved["saved"]:
+                    await briefing_service.invalidate()
+                    if settings.PRESUMMARIZE_ON_INGEST:
+                        summary_service.schedule(saved["saved_ids"])
+
+                result = {key: saved.get(key, 0) for key in ("fetched", "saved", "duplicates", "near_duplicates")}
+                self.status["last_result"] = result
+                self.status["last_error"] = None
+                return result
+
+            except Exception as e:
+                self.status["last_error"] = str(e)
+                raise
+
+            finally:
+                self.status["in_progress"] = False
+                self.status["runs"] += 1
+                self.status["last_finished_at"] = datetime.now()
+                self.status["last_duration_seconds"] = round(time.perf_counter() - started, 3)
+
+    def _next_delay(self) -> float:
+        """Refresh interval with random jitter so workers don't poll upstream in lockstep"""
+        spread = self.interval * self.jitter
+        return max(1.0, self.interval + random.uniform(-spread, spread))
+
+    async def _run_forever(self):
+        while True:
+            # Triggers that arrive during a run schedule another one right after
+            self._wakeup.clear()
+            try:
+                result = await self.run_once()
+                logger.info(f"Scheduled news refresh finished: {result}")
+            except Exception as e:
+                logger.error(f"Scheduled news refresh failed: {e}")
+
+            delay = self._next_delay()
+            self.status["next_run_at"] = datetime.fromtimestamp(time.time() + delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the periodic refresh loop on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run_forever())
+        self.status["scheduler_running"] = True
+        logger.info(f"News refresh scheduler started (every ~{self.interval}s)")
+
+    async def stop(self):
+        """Cancel the refresh loop and wait for it to exit"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.status["scheduler_running"] = False
+        self.status["next_run_at"] = None
+
+    def trigger(self):
+        """Ask the scheduler to refresh now instead of waiting for the next tick"""
+        self._wakeup.set()
+
+# Global instance
+ingestion_service = IngestionService()
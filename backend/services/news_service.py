@@ -1,23 +1,119 @@
 import httpx
 import asyncio
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from backend.core.config import settings
+from backend.core.metrics import NEWS_ARTICLES_FETCHED, NEWS_FETCH_DURATION
 from backend.models.models import Article
 from backend.schemas.schemas import ArticleCreate
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (provider, section) pairs polled by fetch_all_news; "top" means no category filter
+FEEDS = [
+    ("newsapi", "top"),
+    ("newsapi", "business"),
+    ("newsapi", "technology"),
+    ("guardian", "world"),
+    ("guardian", "business"),
+]
+
+@dataclass
+class CursorState:
+    """High-water mark for one feed: newest publish time seen plus HTTP validators"""
+    last_published_at: Optional[datetime] = None  # naive UTC
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+def _as_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize to naive UTC so API timestamps compare with values read from the DB"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 class NewsService:
     def __init__(self):
         self.news_api_key = settings.NEWS_API_KEY
         self.guardian_api_key = settings.GUARDIAN_API_KEY
         self.news_api_base = settings.NEWS_API_BASE_URL
         self.guardian_api_base = settings.GUARDIAN_API_BASE_URL
+        self._client: Optional[httpx.AsyncClient] = None
+        self.feeds = FEEDS
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Build the pooled client used for every upstream request"""
+        http2 = settings.NEWS_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                http2 = False
+        
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.NEWS_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NEWS_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.NEWS_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.NEWS_HTTP_READ_TIMEOUT,
+                connect=settings.NEWS_HTTP_CONNECT_TIMEOUT,
+            ),
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client; created on first use if startup() wasn't called"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+    
+    async def startup(self):
+        """Open the shared HTTP client (called from the app lifespan)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+    
+    async def shutdown(self):
+        """Close the shared HTTP client and its pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_json(self, provider: str, url: str, params: Dict, cursor: Optional[CursorState] = None) -> Optional[Dict]:
+        """GET a JSON document, sending the cursor's validators; None means 304 Not Modified"""
+        headers = {}
+        if cursor and cursor.etag:
+            headers["If-None-Match"] = cursor.etag
+        if cursor and cursor.last_modified:
+            headers["If-Modified-Since"] = cursor.last_modified
+        
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self.client.get(url, params=params, headers=headers)
+            if response.status_code == 304:
+                outcome = "not_modified"
+                return None
+            response.raise_for_status()
+            outcome = "ok"
+        finally:
+            NEWS_FETCH_DURATION.labels(provider, outcome).observe(time.perf_counter() - started)
+        
+        if cursor:
+            cursor.etag = response.headers.get("ETag", cursor.etag)
+            cursor.last_modified = response.headers.get("Last-Modified", cursor.last_modified)
+        return response.json()
         
-    async def fetch_top_headlines(self, category: str = None, country: str = "us") -> List[Dict]:
-        """Fetch top headlines from NewsAPI"""
+    async def fetch_top_headlines(self, category: str = None, country: str = "us", cursor: Optional[CursorState] = None) -> List[Dict]:
+        """Fetch top headlines from NewsAPI
+        
+        /top-headlines has no date filter, so only the conditional request
+        headers from ``cursor`` apply here; older items are dropped later.
+        """
         if not self.news_api_key:
             logger.warning("NewsAPI key not configured")
             return []
@@ -33,23 +129,22 @@ class NewsService:
             params["category"] = category
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") == "ok":
-                    return data.get("articles", [])
-                else:
-                    logger.error(f"NewsAPI error: {data.get('message')}")
-                    return []
+            data = await self._get_json("newsapi", url, params, cursor)
+            if data is None:
+                return []
+            
+            if data.get("status") == "ok":
+                return data.get("articles", [])
+            else:
+                logger.error(f"NewsAPI error: {data.get('message')}")
+                return []
                     
         except Exception as e:
             logger.error(f"Error fetching news from NewsAPI: {e}")
             return []
     
-    async def fetch_guardian_articles(self, section: str = None) -> List[Dict]:
-        """Fetch articles from Guardian API"""
+    async def fetch_guardian_articles(self, section: str = None, cursor: Optional[CursorState] = None) -> List[Dict]:
+        """Fetch articles from Guardian API, only asking for content since the cursor"""
         if not self.guardian_api_key:
             logger.warning("Guardian API key not configured")
             return []
@@ -64,18 +159,21 @@ class NewsService:
         
         if section:
             params["section"] = section
+        
+        # from-date has day granularity; the rest is filtered client-side
+        if cursor and cursor.last_published_at:
+            params["from-date"] = cursor.last_published_at.date().isoformat()
             
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("response", {}).get("status") == "ok":
-                    return data.get("response", {}).get("results", [])
-                else:
-                    logger.error("Guardian API error")
-                    return []
+            data = await self._get_json("guardian", url, params, cursor)
+            if data is None:
+                return []
+            
+            if data.get("response", {}).get("status") == "ok":
+                return data.get("response", {}).get("results", [])
+            else:
+                logger.error("Guardian API error")
+                return []
                     
         except Exception as e:
             logger.error(f"Error fetching news from Guardian: {e}")
@@ -110,54 +208,59 @@ class NewsService:
             category=article.get("sectionName", "general")
         )
     
-    async def fetch_all_news(self) -> List[ArticleCreate]:
-        """Fetch news from all sources"""
+    async def _fetch_feed(self, provider: str, section: str, cursor: CursorState) -> List[ArticleCreate]:
+        """Fetch one feed and keep only items newer than its high-water mark"""
+        if provider == "newsapi":
+            raw = await self.fetch_top_headlines(None if section == "top" else section, cursor=cursor)
+            process = self.process_newsapi_article
+        else:
+            raw = await self.fetch_guardian_articles(section, cursor=cursor)
+            process = self.process_guardian_article
+        NEWS_ARTICLES_FETCHED.labels(provider).inc(len(raw))
+        
+        articles = []
+        for article in raw:
+            try:
+                articles.append(process(article))
+            except Exception as e:
+                logger.error(f"Error processing {provider} article: {e}")
+        
+        since = cursor.last_published_at
+        if since:
+            articles = [
+                article for article in articles
+                if article.published_at is None or _as_utc_naive(article.published_at) > since
+            ]
+        
+        published = [_as_utc_naive(article.published_at) for article in articles if article.published_at]
+        if published:
+            cursor.last_published_at = max(published + ([since] if since else []))
+        
+        return articles
+    
+    async def fetch_all_news(self, cursors: Optional[Dict[Tuple[str, str], CursorState]] = None) -> List[ArticleCreate]:
+        """Fetch news from all sources
+        
+        ``cursors`` maps (provider, section) to its high-water mark; entries
+        are advanced in place so the caller can persist them once the
+        articles are stored. Without cursors every feed is fetched in full.
+        """
+        cursors = cursors if cursors is not None else {}
         tasks = [
-            self.fetch_top_headlines(),
-            self.fetch_top_headlines("business"),
-            self.fetch_top_headlines("technology"),
-            self.fetch_guardian_articles("world"),
-            self.fetch_guardian_articles("business"),
+            self._fetch_feed(provider, section, cursors.setdefault((provider, section), CursorState()))
+            for provider, section in self.feeds
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         all_articles = []
-        
-        # Process NewsAPI results
-        for i, result in enumerate(results[:3]):
-            if isinstance(result, list):
-                for article in result:
-                    try:
-                        processed = self.process_newsapi_article(article)
-                        all_articles.append(processed)
-                    except Exception as e:
-                        logger.error(f"Error processing NewsAPI article: {e}")
-        
-        # Process Guardian results
-        for i, result in enumerate(results[3:]):
+        for (provider, section), result in zip(self.feeds, results):
             if isinstance(result, list):
-                for article in result:
-                    try:
-                        processed = self.process_guardian_article(article)
-                        all_articles.append(processed)
-                    except Exception as e:
-                        logger.error(f"Error processing Guardian article: {e}")
+                all_articles.extend(result)
+            else:
+                logger.error(f"Error fetching {provider}/{section}: {result}")
         
         return all_articles
-    
-    async def get_trending_topics(self) -> List[str]:
-        """Get trending topics from news"""
-        # This is a simplified implementation
-        # In production, you'd use NLP to extract topics
-        articles = await self.fetch_all_news()
-        topics = set()
-        
-        for article in articles:
-            if article.category:
-                topics.add(article.category)
-        
-        return list(topics)
 
 # Global instance
 news_service = NewsService() 
\ No newline at end of file
@@ -0,0 +1,324 @@
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.core.singleflight import create_singleflight
+from backend.models.models import Article, PersonalizedBriefing, UserPreference
+from backend.schemas.schemas import Article as ArticleSchema
+from backend.services.ai_service import ai_service
+from backend.services.preference_service import decode_categories, preference_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BRIEFING_TIME = time(8, 0)
+DEFAULT_TONE = "casual"
+# Latest stories a briefing is written from, and how many are shown with it
+BRIEFING_ARTICLES = 20
+BRIEFING_SHOWN_ARTICLES = 10
+# Stored briefings are kept this many days back
+KEEP_DAYS = 2
+
+@dataclass(frozen=True)
+class BriefingVariant:
+    """One distinct preference set; every user who shares it gets the same briefing"""
+    categories: Tuple[str, ...]  # Sorted and lowercase
+    tone: str
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1(json.dumps([list(self.categories), self.tone]).encode("utf-8")).hexdigest()
+
+def variant_of(categories: Iterable[str], tone_preference: Optional[str]) -> BriefingVariant:
+    """Normalize preferences so equivalent ones share a variant"""
+    normalized = sorted({str(category).strip().lower() for category in categories if str(category).strip()})
+    return BriefingVariant(tuple(normalized), (tone_preference or DEFAULT_TONE).strip().lower())
+
+def parse_briefing_time(value: Optional[str]) -> time:
+    try:
+        return datetime.strptime(value.strip(), "%H:%M").time()
+    except (AttributeError, ValueError):
+        return DEFAULT_BRIEFING_TIME
+
+def next_briefing_at(briefing_time: time, now: datetime) -> datetime:
+    """The next time ``briefing_time`` comes round, today or tomorrow"""
+    at = datetime.combine(now.date(), briefing_time)
+    return at if at > now else at + timedelta(days=1)
+
+class PersonalizedBriefingService:
+    """Pre-generates briefings for users' categories and tone before their briefing_time
+
+    Users with the same preferences share one stored briefing per day. Each
+    variant is generated at a stable slot spread over the window before its
+    earliest user's briefing_time, so the LLM calls are flattened across the
+    night instead of landing when everyone opens the app. briefing_time is
+    read as server local time.
+    """
+
+    def __init__(self):
+        self.window = timedelta(minutes=settings.PERSONALIZED_BRIEFING_WINDOW_MINUTES)
+        self.min_lead = timedelta(minutes=settings.PERSONALIZED_BRIEFING_MIN_LEAD_MINUTES)
+        self.retry_delay = timedelta(seconds=settings.PERSONALIZED_BRIEFING_RETRY_DELAY)
+        self.max_age = timedelta(hours=settings.PERSONALIZED_BRIEFING_MAX_AGE_HOURS)
+        self.tick = settings.PERSONALIZED_BRIEFING_TICK
+        self.flight = create_singleflight("personalized_briefing")
+        self._semaphore = asyncio.Semaphore(settings.PERSONALIZED_BRIEFING_CONCURRENCY)
+        self._retry_at: Dict[Tuple[str, date], datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.status = {
+            "scheduler_running": False,
+            "runs": 0,
+            "last_run_at": None,
+            "users": 0,
+            "variants": 0,
+            "generated": 0,
+            "failed": 0,
+            "next_slot_at": None,
+            "last_error": None,
+        }
+
+    def slot(self, variant: BriefingVariant, briefing_date: date, deadline: datetime) -> datetime:
+        """When to generate a variant: a stable, evenly spread point in the window before its deadline"""
+        digest = hashlib.sha1(f"{variant.key}:{briefing_date.isoformat()}".encode("utf-8")).digest()
+        fraction = int.from_bytes(digest[:4], "big") / 2 ** 32
+        return deadline - self.window * fraction
+
+    async def plan(self, db: AsyncSession, now: datetime) -> Tuple[Dict[Tuple[BriefingVariant, date], datetime], int]:
+        """Generation deadline per (variant, day) for every user's next briefing, and the user count"""
+        # Users with identical preference rows collapse in the database
+        result = await db.execute(
+            select(
+                UserPreference.preferred_categories,
+                UserPreference.tone_preference,
+                UserPreference.briefing_time,
+                func.count(),
+            ).group_by(
+                UserPreference.preferred_categories,
+                UserPreference.tone_preference,
+                UserPreference.briefing_time,
+            )
+        )
+
+        deadlines, users = {}, 0
+        for categories, tone, briefing_time, count in result.all():
+            users += count
+            at = next_briefing_at(parse_briefing_time(briefing_time), now)
+            key = (variant_of(decode_categories(categories), tone), at.date())
+            deadline = at - self.min_lead
+            if key not in deadlines or deadline < deadlines[key]:
+                deadlines[key] = deadline
+        return deadlines, users
+
+    async def _stored(self, db: AsyncSession, days: Set[date]) -> Set[Tuple[str, date]]:
+        if not days:
+            return set()
+        result = await db.execute(
+            select(PersonalizedBriefing.variant_key, PersonalizedBriefing.briefing_date)
+            .where(PersonalizedBriefing.briefing_date.in_(days))
+        )
+        return set(result.all())
+
+    async def _prune(self, db: AsyncSession, today: date):
+        cutoff = today - timedelta(days=KEEP_DAYS)
+        await db.execute(delete(PersonalizedBriefing).where(PersonalizedBriefing.briefing_date < cutoff))
+        await db.commit()
+        self._retry_at = {key: at for key, at in self._retry_at.items() if key[1] >= today}
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict:
+        """Generate every variant whose slot has come and that isn't stored yet"""
+        now = now or datetime.now()
+        async with AsyncSessionLocal() as db:
+            deadlines, users = await self.plan(db, now)
+            stored = await self._stored(db, {day for _, day in deadlines})
+            await self._prune(db, now.date())
+
+        due, upcoming = [], []
+        for (variant, day), deadline in deadlines.items():
+            if (variant.key, day) in stored:
+                continue
+            slot = max(self.slot(variant, day, deadline), self._retry_at.get((variant.key, day), deadline - self.window))
+            if slot <= now:
+                due.append((variant, day))
+            else:
+                upcoming.append(slot)
+
+        outcomes = await asyncio.gather(*[self._generate_scheduled(variant, day) for variant, day in due])
+        generated = sum(outcomes)
+
+        self.status["runs"] += 1
+        self.status["last_run_at"] = now
+        self.status["users"] = users
+        self.status["variants"] = len(deadlines)
+        self.status["generated"] += generated
+        self.status["failed"] += len(due) - generated
+        self.status["next_slot_at"] = min(upcoming) if upcoming else None
+        return {"users": users, "variants": len(deadlines), "generated": generated, "failed": len(due) - generated}
+
+    async def _generate_scheduled(self, variant: BriefingVariant, briefing_date: date) -> bool:
+        async with self._semaphore:
+            try:
+                await self.generate(variant, briefing_date)
+            except Exception as e:
+                logger.error(f"Error pre-generating briefing for {list(variant.categories)} ({variant.tone}): {e}")
+                self.status["last_error"] = str(e)
+                self._retry_at[(variant.key, briefing_date)] = datetime.now() + self.retry_delay
+                return False
+        self._retry_at.pop((variant.key, briefing_date), None)
+        return True
+
+    async def generate(self, variant: BriefingVariant, briefing_date: date) -> Dict:
+        """Generate and store one variant's briefing for a day; concurrent calls share one generation
+
+        Raises instead of storing a fallback, so the variant is retried later.
+        """
+        return await self.flight.do(
+            f"{variant.key}:{briefing_date.isoformat()}",
+            lambda: self._generate(variant, briefing_date)
+        )
+
+    async def _generate(self, variant: BriefingVariant, briefing_date: date) -> Dict:
+        # Uses its own sessions: the shared call can outlive the request that started it
+        async with AsyncSessionLocal() as db:
+            # Another worker may have stored it already
+            result = await db.execute(
+                select(PersonalizedBriefing).where(
+                    PersonalizedBriefing.variant_key == variant.key,
+                    PersonalizedBriefing.briefing_date == briefing_date,
+                )
+            )
+            existing = result.scalars().first()
+            if existing:
+                return self._record(existing)
+            articles = await self.select_articles(db, variant.categories)
+
+        if not articles:
+            raise ValueError("No articles stored yet")
+
+        summary = await ai_service.generate_morning_briefing(articles, fallback=False, tone=variant.tone)
+        record = {
+            "summary": summary,
+            "article_ids": [article.id for article in articles[:BRIEFING_SHOWN_ARTICLES]],
+            "generated_at": datetime.now().isoformat(),
+        }
+        await self._store(variant, briefing_date, record)
+        return record
+
+    async def _store(self, variant: BriefingVariant, briefing_date: date, record: Dict):
+        async with AsyncSessionLocal() as db:
+            db.add(PersonalizedBriefing(
+                variant_key=variant.key,
+                briefing_date=briefing_date,
+                categories=json.dumps(list(variant.categories)),
+                tone=variant.tone,
+                summary=record["summary"],
+                article_ids=json.dumps(record["article_ids"]),
+                generated_at=datetime.fromisoformat(record["generated_at"]),
+            ))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another worker stored this variant first
+                await db.rollback()
+
+    def _record(self, row: PersonalizedBriefing) -> Dict:
+        return {
+            "summary": row.summary,
+            "article_ids": json.loads(row.article_ids) if row.article_ids else [],
+            "generated_at": row.generated_at.isoformat(),
+        }
+
+    async def select_articles(self, db: AsyncSession, categories: Tuple[str, ...]) -> List[ArticleSchema]:
+        """Latest distinct stories in the given categories, or across all when none match"""
+        query = (
+            select(Article)
+            .where(Article.canonical_id.is_(None))
+            .order_by(Article.created_at.desc())
+            .limit(BRIEFING_ARTICLES)
+        )
+        if categories:
+            result = await db.execute(query.where(Article.category.in_(categories)))
+            articles = result.scalars().all()
+            if articles:
+                return [ArticleSchema.from_orm(article) for article in articles]
+
+        result = await db.execute(query)
+        return [ArticleSchema.from_orm(article) for article in result.scalars()]
+
+    async def get_for_user(self, db: AsyncSession, user_id: str) -> Optional[Tuple[str, List[ArticleSchema], datetime]]:
+        """The briefing stored for the user's preferences, generated now on a miss
+
+        Returns None when the user has no preferences or nothing could be
+        generated, so the caller can serve the generic briefing instead.
+        """
+        preferences = await preference_service.get(db, user_id)
+        if not preferences:
+            return None
+
+        now = datetime.now()
+        variant = variant_of(preferences.preferred_categories or [], preferences.tone_preference)
+        result = await db.execute(
+            select(PersonalizedBriefing)
+            .where(
+                PersonalizedBriefing.variant_key == variant.key,
+                PersonalizedBriefing.generated_at >= now - self.max_age,
+            )
+            .order_by(PersonalizedBriefing.generated_at.desc())
+            .limit(1)
+        )
+        row = result.scalars().first()
+
+        if row:
+            record = self._record(row)
+        else:
+            try:
+                record = await self.generate(variant, now.date())
+            except Exception as e:
+                logger.warning(f"Personalized briefing unavailable for {user_id}, serving the generic one: {e}")
+                return None
+
+        article_ids = record["article_ids"]
+        result = await db.execute(select(Article).where(Article.id.in_(article_ids)))
+        by_id = {article.id: article for article in result.scalars()}
+        articles = [ArticleSchema.from_orm(by_id[article_id]) for article_id in article_ids if article_id in by_id]
+        return record["summary"], articles, datetime.fromisoformat(record["generated_at"])
+
+    async def _run_forever(self):
+        while True:
+            try:
+                result = await self.run_once()
+                if result["generated"] or result["failed"]:
+                    logger.info(f"Personalized briefing pass finished: {result}")
+            except Exception as e:
+                self.status["last_error"] = str(e)
+                logger.error(f"Personalized briefing pass failed: {e}")
+            await asyncio.sleep(self.tick)
+
+    def start(self):
+        """Start the pre-generation loop on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run_forever())
+        self.status["scheduler_running"] = True
+        logger.info(f"Personalized briefing scheduler started (every {self.tick}s)")
+
+    async def stop(self):
+        """Cancel the pre-generation loop and wait for it to exit"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.status["scheduler_running"] = False
+
+# Global instance
+personalized_briefing_service = PersonalizedBriefingService()
@@ -0,0 +1,77 @@
+import json
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.cache import create_cache
+from backend.core.config import settings
+from backend.models.models import UserPreference
+from backend.schemas.schemas import UserPreference as UserPreferenceSchema
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cached for users without stored preferences, so they don't cost a query either
+MISSING = {"missing": True}
+
+def decode_categories(preferred_categories: Optional[str]) -> List[str]:
+    """The stored JSON category list as a list"""
+    try:
+        categories = json.loads(preferred_categories) if preferred_categories else []
+    except ValueError:
+        return []
+    return categories if isinstance(categories, list) else []
+
+class PreferenceService:
+    """Read-through cache of decoded user preferences
+
+    Writers must call ``invalidate`` after committing. With the in-process
+    backend other workers may serve the old preferences for up to the TTL.
+    """
+
+    def __init__(self):
+        self.cache = create_cache(
+            "preferences",
+            maxsize=settings.PREFERENCES_CACHE_MAX_ENTRIES,
+            ttl=settings.PREFERENCES_CACHE_TTL
+        )
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def get(self, db: AsyncSession, user_id: str) -> Optional[UserPreferenceSchema]:
+        """The user's preferences, or None if they haven't stored any"""
+        cached = await self.cache.get(user_id)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return None if cached.get("missing") else UserPreferenceSchema.model_validate(cached)
+
+        self.stats["misses"] += 1
+        result = await db.execute(select(UserPreference).where(UserPreference.user_id == user_id))
+        row = result.scalars().first()
+        if not row:
+            await self.cache.set(user_id, MISSING)
+            return None
+
+        preferences = UserPreferenceSchema(
+            id=row.id,
+            user_id=row.user_id,
+            preferred_categories=decode_categories(row.preferred_categories),
+            tone_preference=row.tone_preference,
+            briefing_time=row.briefing_time,
+            created_at=row.created_at
+        )
+        await self.cache.set(user_id, preferences.model_dump(mode="json"))
+        return preferences
+
+    async def invalidate(self, user_id: str):
+        """Drop the cached preferences for a user, e.g. after they're updated"""
+        await self.cache.delete(user_id)
+        self.stats["invalidations"] += 1
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+# Global instance
+preference_service = PreferenceService()
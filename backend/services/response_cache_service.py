@@ -0,0 +1,201 @@
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Set, Tuple
+from backend.core.cache import fingerprint
+from backend.core.config import settings
+from backend.schemas.schemas import Article
+from backend.services.ai_service import ai_service
+from backend.services.context_service import ChatContext
+from backend.services.text_utils import normalize_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Questions that differ in any of these words ask something else ("up" vs
+# "down", "buy" vs "not buy"), however similar the rest of the wording
+POLARITY_WORDS = frozenset("""
+no not nor never none without t dont doesnt didnt isnt arent wasnt werent cant couldnt wont wouldnt shouldnt
+up down rise rising fall falling higher lower above below over under more less most least
+increase decrease gain gains loss losses buy sell bull bullish bear bearish before after best worst
+""".split())
+
+def question_words(message: str) -> FrozenSet[str]:
+    """Every normalized word of a question; short words and stopwords can change its meaning"""
+    return frozenset(normalize_text(message).split())
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def question_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Word-set Jaccard of two questions, 0 if they differ in a polarity word"""
+    if (a ^ b) & POLARITY_WORDS:
+        return 0.0
+    return jaccard(a, b)
+
+class ResponseCacheService:
+    """Reuses chat replies to repeated first-turn questions about the same news
+
+    Entries are keyed by the fingerprint of the news context sent with the
+    prompt plus the normalized question, so a reply is only reused while the
+    same articles back it. Questions worded slightly differently match by
+    word-set similarity within the same news context, unless they differ in
+    a negation or direction word. In-process, per worker.
+    """
+
+    def __init__(self):
+        self.enabled = settings.CHAT_RESPONSE_CACHE_ENABLED
+        self.ttl = settings.CHAT_RESPONSE_CACHE_TTL
+        self.maxsize = settings.CHAT_RESPONSE_CACHE_MAX_ENTRIES
+        self.similarity = settings.CHAT_RESPONSE_CACHE_SIMILARITY
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._by_context: Dict[str, Set[str]] = {}
+        self.stats = {
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "ineligible": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def eligible(self, context: ChatContext) -> bool:
+        """Only replies that don't depend on earlier turns can be shared"""
+        return self.enabled and not context.history and not context.summary
+
+    def context_key(self, articles: List[Article]) -> str:
+        return fingerprint([settings.OPENAI_MODEL] + [article.id for article in articles])
+
+    def _remove(self, key: Tuple[str, str]):
+        self._entries.pop(key, None)
+        questions = self._by_context.get(key[0])
+        if questions is not None:
+            questions.discard(key[1])
+            if not questions:
+                del self._by_context[key[0]]
+
+    def _live(self, key: Tuple[str, str]) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    def get(self, message: str, articles: List[Article]) -> Optional[str]:
+        """Cached reply for this question and news context, if any"""
+        context_key = self.context_key(articles)
+        question = normalize_text(message)
+
+        entry = self._live((context_key, question))
+        if entry is not None:
+            self._entries.move_to_end((context_key, question))
+            self.stats["exact_hits"] += 1
+            return entry[2]
+
+        words = question_words(message)
+        best, best_score = None, self.similarity
+        for candidate in list(self._by_context.get(context_key, ())):
+            entry = self._live((context_key, candidate))
+            if entry is None:
+                continue
+            score = question_similarity(words, entry[1])
+            if score >= best_score:
+                best, best_score = candidate, score
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end((context_key, best))
+        self.stats["similar_hits"] += 1
+        return self._entries[(context_key, best)][2]
+
+    def set(self, message: str, articles: List[Article], response: str):
+        key = (self.context_key(articles), normalize_text(message))
+        self._entries[key] = (time.monotonic() + self.ttl, question_words(message), response)
+        self._entries.move_to_end(key)
+        self._by_context.setdefault(key[0], set()).add(key[1])
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_context.clear()
+
+    def get_stats(self) -> Dict:
+        hits = self.stats["exact_hits"] + self.stats["similar_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def chat_response(self, message: str, context: ChatContext, articles: List[Article]) -> str:
+        """ai_service.chat_response, answered from the cache when possible"""
+        if not self.eligible(context):
+            if self.enabled:
+                self.stats["ineligible"] += 1
+            return await ai_service.chat_response(
+                message=message,
+                conversation_history=context.history,
+                articles=articles,
+                context_summary=context.summary
+            )
+
+        cached = self.get(message, articles)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await ai_service.chat_response(message=message, articles=articles, fallback=False)
+        except Exception:
+            # Don't cache the fallback, so the next asker gets a real answer
+            return ai_service.fallback_chat_response(message, articles)
+
+        self.set(message, articles, response)
+        return response
+
+    async def stream_chat_response(self, message: str, context: ChatContext, articles: List[Article]) -> AsyncIterator[str]:
+        """ai_service.stream_chat_response, answered from the cache when possible"""
+        if not self.eligible(context):
+            if self.enabled:
+                self.stats["ineligible"] += 1
+            async for token in ai_service.stream_chat_response(
+                message=message,
+                conversation_history=context.history,
+                articles=articles,
+                context_summary=context.summary
+            ):
+                yield token
+            return
+
+        cached = self.get(message, articles)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        try:
+            async for token in ai_service.stream_chat_response(message=message, articles=articles, fallback=False):
+                chunks.append(token)
+                yield token
+        except Exception:
+            # Mirror ai_service: fall back only if nothing was streamed yet, and never cache it
+            if not chunks:
+                for word in ai_service.stream_words(ai_service.fallback_chat_response(message, articles)):
+                    yield word
+            return
+
+        self.set(message, articles, "".join(chunks))
+
+# Global instance
+response_cache_service = ResponseCacheService()
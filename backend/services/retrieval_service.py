@@ -0,0 +1,226 @@
+import asyncio
+import math
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from backend.core.config import settings
+from backend.core.database import AsyncSessionLocal
+from backend.models.models import Article
+from backend.schemas.schemas import Article as ArticleSchema
+from backend.services.ai_service import ai_service, estimate_tokens
+from backend.services.text_utils import tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Title words count this many times over body words
+TITLE_WEIGHT = 2
+
+# Reference point for the index's timestamps, which are stored as seconds since it
+EPOCH = datetime(2020, 1, 1)
+
+# Rebuild once this share of the index has aged out of the recency window
+PRUNE_FRACTION = 0.2
+
+def story_time(article) -> datetime:
+    """When an article's story broke, as naive UTC; stored time if it has no publish time"""
+    at = article.published_at or article.created_at or datetime.utcnow()
+    if at.tzinfo is not None:
+        at = (at - at.utcoffset()).replace(tzinfo=None)
+    return at
+
+class ArticleIndex:
+    """In-memory BM25 inverted index over article text
+
+    Postings are compact append-only arrays, so adding articles is cheap and
+    a query only touches the postings of its own terms. Articles can't be
+    removed; searches skip those older than ``since`` and the owner rebuilds
+    the index to reclaim them.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.article_ids = array("q")
+        self.doc_lengths = array("f")
+        self.timestamps = array("d")
+        self.total_length = 0.0
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.positions: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.article_ids)
+
+    def add(self, article_id: int, title: Optional[str], body: Optional[str], timestamp: float = 0.0):
+        if article_id in self.positions:
+            return
+        counts = Counter(tokenize(body))
+        for term in tokenize(title):
+            counts[term] += TITLE_WEIGHT
+
+        position = len(self.article_ids)
+        self.positions[article_id] = position
+        self.article_ids.append(article_id)
+        length = float(sum(counts.values()))
+        self.doc_lengths.append(length)
+        self.timestamps.append(timestamp)
+        self.total_length += length
+
+        for term, count in counts.items():
+            docs, freqs = self.postings.setdefault(term, (array("i"), array("f")))
+            docs.append(position)
+            freqs.append(count)
+
+    def count_older(self, since: float) -> int:
+        """Number of indexed articles with a timestamp before ``since``"""
+        return int(np.count_nonzero(np.array(self.timestamps) < since))
+
+    def search(self, query: str, k: int = 10, since: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Top ``k`` (article_id, score) pairs for the query, best first, skipping articles before ``since``"""
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        total = len(self.article_ids)
+        if not terms or not total:
+            return []
+
+        doc_lengths = np.array(self.doc_lengths, dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * doc_lengths / (self.total_length / total))
+        scores = np.zeros(total, dtype=np.float32)
+
+        for term in terms:
+            docs, freqs = self.postings[term]
+            docs = np.array(docs, dtype=np.int32)
+            freqs = np.array(freqs, dtype=np.float32)
+            idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            # Each article appears once per term, so fancy-index accumulation is safe
+            scores[docs] += idf * freqs * (self.k1 + 1) / (freqs + length_norm[docs])
+
+        if since is not None:
+            scores[np.array(self.timestamps) < since] = 0
+
+        k = min(k, total)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.article_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+class RetrievalService:
+    """Picks the stored articles most relevant to a chat message, fully offline
+
+    Only articles from the last RETRIEVAL_WINDOW_HOURS are offered, so old
+    stories aren't passed off as current news. Each worker keeps its own
+    index and refreshes it from the database every RETRIEVAL_REFRESH_INTERVAL
+    seconds, picking up articles other workers stored and rebuilding once
+    enough of it has aged out of the window.
+    """
+
+    def __init__(self):
+        self.index = ArticleIndex()
+        self.window = timedelta(hours=settings.RETRIEVAL_WINDOW_HOURS)
+        self.refresh_interval = settings.RETRIEVAL_REFRESH_INTERVAL
+        self.last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"indexed": 0, "rebuilds": 0, "refreshes": 0}
+
+    def _since(self) -> float:
+        return (datetime.utcnow() - self.window - EPOCH).total_seconds()
+
+    def _add(self, index: ArticleIndex, article, since: float):
+        timestamp = (story_time(article) - EPOCH).total_seconds()
+        if timestamp >= since:
+            index.add(article.id, article.title, article.summary, timestamp)
+
+    def add_articles(self, articles: Iterable[Article]):
+        """Index newly stored canonical articles; safe to call with already indexed ones"""
+        since = self._since()
+        for article in articles:
+            self._add(self.index, article, since)
+        self.stats["indexed"] = len(self.index)
+
+    async def _load(self, index: ArticleIndex, after_id: int = 0) -> int:
+        """Add canonical articles within the window and newer than ``after_id`` to ``index``
+
+        Returns the highest ID seen. Only loads advance ``last_id``: articles
+        this worker indexed on ingest may have overtaken another worker's.
+        """
+        last_id = after_id
+        since = self._since()
+        async with AsyncSessionLocal() as db:
+            # Articles are stored after their story breaks, so created_at bounds the scan
+            result = await db.stream(
+                select(Article.id, Article.title, Article.summary, Article.published_at, Article.created_at)
+                .where(
+                    Article.canonical_id.is_(None),
+                    Article.created_at >= datetime.utcnow() - self.window,
+                    Article.id > after_id,
+                )
+                .order_by(Article.id)
+            )
+            async for row in result:
+                self._add(index, row, since)
+                last_id = row.id
+        return last_id
+
+    async def rebuild(self):
+        """Index the stored articles within the recency window, e.g. at startup"""
+        index = ArticleIndex()
+        self.last_id = await self._load(index)
+        self.index = index
+        self.stats["rebuilds"] += 1
+        self.stats["indexed"] = len(index)
+        logger.info(f"Indexed {len(index)} articles for chat retrieval")
+
+    async def refresh(self):
+        """Pick up articles stored since the last load, or rebuild if enough have aged out"""
+        if self.index.count_older(self._since()) >= max(1, len(self.index) * PRUNE_FRACTION):
+            await self.rebuild()
+            return
+        self.last_id = await self._load(self.index, after_id=self.last_id)
+        self.stats["refreshes"] += 1
+        self.stats["indexed"] = len(self.index)
+
+    async def _run_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing the chat retrieval index: {e}")
+
+    def start(self):
+        """Start the periodic refresh loop on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run_forever())
+        logger.info(f"Chat retrieval index refresh started (every {self.refresh_interval}s)")
+
+    async def stop(self):
+        """Cancel the refresh loop and wait for it to exit"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def search(self, query: str, k: int = 10) -> List[int]:
+        """IDs of the recent articles most relevant to ``query``, best first; empty if nothing matches"""
+        return [article_id for article_id, _ in self.index.search(query, k, since=self._since())]
+
+    def fit_to_budget(self, articles: List[ArticleSchema], token_budget: Optional[int] = None, max_articles: Optional[int] = None) -> List[ArticleSchema]:
+        """Take articles in order while their prompt lines fit the token budget"""
+        token_budget = token_budget or settings.CHAT_NEWS_TOKEN_BUDGET
+        max_articles = max_articles or settings.CHAT_CONTEXT_ARTICLES
+        selected, used = [], 0
+        for article in articles[:max_articles]:
+            used += estimate_tokens(ai_service.news_context_line(article))
+            if selected and used > token_budget:
+                break
+            selected.append(article)
+        return selected
+
+# Global instance
+retrieval_service = RetrievalService()
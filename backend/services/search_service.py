@@ -0,0 +1,135 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import DateTime, Float, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_WORD = re.compile(r"\w+", re.UNICODE)
+
+RESULT_COLUMNS = "a.id, a.title, a.source, a.category, a.url, a.published_at, a.created_at"
+
+# Only the newest SEARCH_CANDIDATE_LIMIT canonical matches are ranked: FTS5
+# walks its doclists in rowid order, so this bounds the work for broad terms
+# that match much of the corpus. Both backends drop near-duplicates before
+# the cap so they return the same pages.
+# bm25() is lower-is-better, so negate it into a higher-is-better score;
+# weights favour title over description over body.
+SQLITE_SEARCH = f"""
+    SELECT {RESULT_COLUMNS}, m.score
+    FROM (
+        SELECT f.rowid AS match_id, -bm25(articles_fts, 10.0, 4.0, 1.0) AS score
+        FROM articles_fts f
+        JOIN articles c ON c.id = f.rowid
+        WHERE articles_fts MATCH :query AND c.canonical_id IS NULL
+        ORDER BY f.rowid DESC
+        LIMIT :candidates
+    ) m
+    JOIN articles a ON a.id = m.match_id
+    WHERE :after_score IS NULL OR m.score < :after_score OR (m.score = :after_score AND a.id > :after_id)
+    ORDER BY m.score DESC, a.id
+    LIMIT :limit
+"""
+
+# Highlights only for the rows on the page; snippet() re-reads each document
+SQLITE_SNIPPETS = """
+    SELECT rowid AS id, snippet(articles_fts, -1, '<mark>', '</mark>', '…', 24) AS snippet
+    FROM articles_fts
+    WHERE articles_fts MATCH :query AND rowid IN ({ids})
+"""
+
+POSTGRES_SEARCH = f"""
+    WITH candidates AS (
+        SELECT a.id
+        FROM articles a, websearch_to_tsquery('english', :query) query
+        WHERE a.search_vector @@ query AND a.canonical_id IS NULL
+        ORDER BY a.id DESC
+        LIMIT :candidates
+    ), ranked AS (
+        SELECT {RESULT_COLUMNS}, a.summary, query,
+               ts_rank_cd(a.search_vector, query)::float8 AS score
+        FROM candidates c
+        JOIN articles a ON a.id = c.id, websearch_to_tsquery('english', :query) query
+    ), page AS (
+        SELECT * FROM ranked
+        WHERE CAST(:after_score AS float8) IS NULL
+           OR score < :after_score OR (score = :after_score AND id > :after_id)
+        ORDER BY score DESC, id
+        LIMIT :limit
+    )
+    -- Highlight only the rows on this page; ts_headline is expensive
+    SELECT id, title, source, category, url, published_at, created_at, score,
+           ts_headline('english', coalesce(summary, title), query,
+                       'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15') AS snippet
+    FROM page
+    ORDER BY score DESC, id
+"""
+
+class SearchService:
+    """Ranked full-text article search on the database's own index (FTS5 or tsvector)"""
+
+    def __init__(self):
+        self.candidate_limit = settings.SEARCH_CANDIDATE_LIMIT
+
+    def candidates(self, dialect: str) -> Optional[int]:
+        """The LIMIT on matches considered for ranking; a limit of 0 ranks every match"""
+        if self.candidate_limit > 0:
+            return self.candidate_limit
+        # SQLite spells "no limit" as a negative LIMIT, Postgres as LIMIT NULL
+        return -1 if dialect == "sqlite" else None
+
+    def fts5_query(self, query: str) -> str:
+        """User input as a safe FTS5 expression with every word required
+        
+        Words are quoted so operators and punctuation can't break the query.
+        No prefix matching: the porter tokenizer already matches inflections,
+        and prefix terms make FTS5 merge every matching doclist.
+        """
+        return " ".join(f'"{word}"' for word in _SEARCH_WORD.findall(query))
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 20,
+        after: Optional[Dict] = None,
+    ) -> Tuple[List[Dict], bool]:
+        """One page of matches, best first, plus whether another page follows
+        
+        ``after`` is a decoded (score, id) cursor from the previous page.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            statement, query = SQLITE_SEARCH, self.fts5_query(query)
+        elif dialect == "postgresql":
+            statement = POSTGRES_SEARCH
+        else:
+            raise ValueError(f"Full-text search is not supported on {dialect}")
+        
+        if not query.strip():
+            return [], False
+        
+        statement = text(statement).columns(published_at=DateTime, created_at=DateTime, score=Float)
+        result = await db.execute(statement, {
+            "query": query,
+            "after_score": after["score"] if after else None,
+            "after_id": after["id"] if after else 0,
+            "candidates": self.candidates(dialect),
+            "limit": limit + 1,
+        })
+        rows = [dict(row._mapping) for row in result]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if dialect == "sqlite" and rows:
+            ids = ", ".join(str(int(row["id"])) for row in rows)
+            snippets = await db.execute(text(SQLITE_SNIPPETS.format(ids=ids)), {"query": query})
+            by_id = dict(snippets.all())
+            for row in rows:
+                row["snippet"] = by_id.get(row["id"])
+        return rows, has_more
+
+# Global instance
+search_service = SearchService()
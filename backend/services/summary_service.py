@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Set
+from sqlalchemy import select
+from backend.core.config import settings
+from backend.core.singleflight import create_singleflight
+from backend.core.database import AsyncSessionLocal
+from backend.models.models import Article
+from backend.schemas.schemas import Article as ArticleSchema
+from backend.services.ai_service import ai_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+def content_hash(title: Optional[str], content: Optional[str]) -> str:
+    """Hash of the text a summary is generated from; edits to either change it"""
+    digest = hashlib.sha256()
+    digest.update((title or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((content or "").encode("utf-8"))
+    return digest.hexdigest()
+
+class SummaryService:
+    """AI article summaries persisted on the article row and reused until it changes"""
+
+    def __init__(self):
+        self.concurrency = settings.PRESUMMARIZE_CONCURRENCY
+        self._tasks: Set[asyncio.Task] = set()
+        self.flight = create_singleflight("summary")
+
+    def is_current(self, article: Article) -> bool:
+        """Whether the stored summary still matches the article's title and content"""
+        return bool(article.ai_summary) and article.ai_summary_hash == content_hash(article.title, article.content)
+
+    async def get_summary(self, article: Article) -> str:
+        """Return the stored summary, generating and saving it on first use
+        
+        Concurrent requests for the same article version share one generation.
+        """
+        if self.is_current(article):
+            return article.ai_summary
+
+        digest = content_hash(article.title, article.content)
+        article_schema = ArticleSchema.from_orm(article)
+        return await self.flight.do(
+            f"{article.id}:{digest}",
+            lambda: self._generate(article_schema, digest)
+        )
+
+    async def _generate(self, article: ArticleSchema, digest: str) -> str:
+        # Stored through its own session: the shared call can outlive the request that started it
+        try:
+            summary = await ai_service.summarize_article(article, fallback=False)
+        except Exception:
+            # Don't persist the fallback, so a later request retries OpenAI
+            return ai_service.fallback_summary(article)
+
+        await self._store({article.id: (summary, digest)})
+        return summary
+
+    async def _load_stale(self, article_ids: List[int]) -> List[ArticleSchema]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Article).where(Article.id.in_(article_ids)))
+            return [ArticleSchema.from_orm(article) for article in result.scalars() if not self.is_current(article)]
+
+    async def _store(self, summaries: Dict[int, tuple]):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Article).where(Article.id.in_(list(summaries))))
+            for article in result.scalars():
+                summary, digest = summaries[article.id]
+                # Skip articles edited while we were summarizing
+                if content_hash(article.title, article.content) == digest:
+                    article.ai_summary = summary
+                    article.ai_summary_hash = digest
+            await db.commit()
+
+    async def presummarize(self, article_ids: List[int]) -> int:
+        """Summarize articles ahead of time in batched requests; returns how many were stored"""
+        articles = await self._load_stale(article_ids)
+        generated = await ai_service.summarize_articles(articles, concurrency=self.concurrency)
+        summaries = {
+            article.id: (generated[article.id], content_hash(article.title, article.content))
+            for article in articles if article.id in generated
+        }
+
+        if summaries:
+            await self._store(summaries)
+        logger.info(f"Pre-summarized {len(summaries)} of {len(articles)} new articles")
+        return len(summaries)
+
+    async def _presummarize_in_background(self, article_ids: List[int]):
+        try:
+            await self.presummarize(article_ids)
+        except Exception as e:
+            logger.error(f"Error pre-summarizing articles: {e}")
+
+    def schedule(self, article_ids: List[int]):
+        """Pre-summarize in the background without holding up the caller"""
+        task = asyncio.create_task(self._presummarize_in_background(article_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self):
+        """Cancel background pre-summarization still in flight"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+# Global instance
+summary_service = SummaryService()
@@ -0,0 +1,136 @@
+import hashlib
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, strip punctuation and collapse whitespace for comparisons"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def dedup_key(title: Optional[str], url: Optional[str] = None) -> str:
+    """Key identifying the same story within a source: normalized title, else URL"""
+    basis = normalize_text(title) or (url or "").strip().lower()
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my
+no nor not now of off on once only or other our ours out over own same she should so some such
+than that the their theirs them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours
+new says said say after amid over under one two three first last year years day week get gets
+""".split())
+
+_WORD = re.compile(r"[a-z][a-z0-9']+")
+_ENTITY = re.compile(r"\b[A-Z][\w'&-]*(?:[ \t]+(?:(?:of|the|for|de)[ \t]+)?[A-Z][\w'&-]*)+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Content words from text: normalized, without stopwords or very short tokens"""
+    return [
+        word for word in _WORD.findall(normalize_text(text))
+        if len(word) > 2 and word not in STOPWORDS
+    ]
+
+def extract_entities(text: Optional[str]) -> List[str]:
+    """Multi-word capitalized phrases such as "Federal Reserve" or "Elon Musk"
+
+    A cheap stand-in for NER that is good enough for ranking headlines.
+    """
+    if not text:
+        return []
+    entities = []
+    for match in _ENTITY.finditer(text):
+        # Drop a leading stopword picked up from a capitalized sentence start
+        words = match.group(0).split()
+        while words and words[0].lower() in STOPWORDS:
+            words = words[1:]
+        if len(words) > 1:
+            entities.append(" ".join(words))
+    return entities
+
+_TAG = re.compile(r"<[^>]+>")
+MASK64 = (1 << 64) - 1
+
+# Fewer distinct features than this gives a fingerprint too noisy to compare
+MIN_SIMHASH_FEATURES = 8
+
+def simhash(text: Optional[str]) -> Optional[int]:
+    """64-bit SimHash over the word unigrams and bigrams of ``text``
+
+    Similar texts get fingerprints a few bits apart. Returns None when there
+    is too little text to fingerprint reliably.
+    """
+    words = normalize_text(_TAG.sub(" ", text or "")).split()
+    features = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+    if len(features) < MIN_SIMHASH_FEATURES:
+        return None
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little") for feature in features],
+        dtype="<u8",
+    )
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    majority = np.nonzero(bits.sum(axis=0) * 2 > len(features))[0]
+    return sum(1 << int(bit) for bit in majority)
+
+def story_simhash(title: Optional[str], summary: Optional[str], content: Optional[str]) -> Optional[int]:
+    """Fingerprint of a story's body, so retitled copies still match
+
+    The title only counts when there is too little body text on its own.
+    """
+    body = " ".join(text for text in (summary, (content or "")[:2000]) if text)
+    return simhash(body) or simhash(f"{title or ''} {body}")
+
+def signed64(value: int) -> int:
+    """Two's complement view of a 64-bit fingerprint, for signed BIGINT columns"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+class SimHashIndex:
+    """Finds stored fingerprints within a Hamming distance of a query
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle any match agrees exactly on at least one band, so a lookup only
+    compares against the few entries sharing a band bucket.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = 64 // bands
+        self._bands = [
+            (i * width, (64 if i == bands - 1 else (i + 1) * width) - i * width)
+            for i in range(bands)
+        ]
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, int]]] = defaultdict(list)
+        self.size = 0
+
+    def _keys(self, fingerprint: int):
+        for band, (shift, width) in enumerate(self._bands):
+            yield band, (fingerprint >> shift) & ((1 << width) - 1)
+
+    def add(self, key: int, fingerprint: int):
+        fingerprint &= MASK64
+        for bucket in self._keys(fingerprint):
+            self._buckets[bucket].append((key, fingerprint))
+        self.size += 1
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Key of the closest stored fingerprint within max_distance, if any"""
+        fingerprint &= MASK64
+        best, best_distance = None, self.max_distance + 1
+        for bucket in self._keys(fingerprint):
+            for key, candidate in self._buckets.get(bucket, ()):
+                distance = (fingerprint ^ candidate).bit_count()
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
@@ -0,0 +1,131 @@
+import math
+from typing import Dict, List, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.core.config import settings
+from backend.models.models import Article, TrendingTerm
+from backend.services.text_utils import extract_entities, tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reference point for forward decay; scores grow as exp(rate * (t - EPOCH))
+EPOCH = datetime(2020, 1, 1)
+
+# How much one article contributes per place a term appears
+TITLE_TERM_WEIGHT = 1.0
+SUMMARY_TERM_WEIGHT = 0.5
+TITLE_ENTITY_WEIGHT = 2.0
+SUMMARY_ENTITY_WEIGHT = 1.0
+
+def _logaddexp(a: float, b: float) -> float:
+    """log(exp(a) + exp(b)) without overflow"""
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+class TrendingService:
+    """Time-decayed term and entity counts over recently ingested articles
+    
+    Uses forward decay: each mention is stored as log(weight) + rate * (t - EPOCH),
+    so scores never need rewriting as time passes and ranking by the stored
+    log_score equals ranking by the decayed score. Reads are an indexed top-k.
+    """
+    
+    def __init__(self):
+        self.decay_rate = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+        self.window = timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    
+    def _log_weight(self, weight: float, at: datetime) -> float:
+        return math.log(weight) + self.decay_rate * (at - EPOCH).total_seconds()
+    
+    def article_terms(self, article: Article) -> Dict[Tuple[str, str], float]:
+        """(kind, term) -> weight for one article, counting each term once"""
+        weights = {}
+        
+        def add(kind: str, term: str, weight: float):
+            key = (kind, term[:200])
+            weights[key] = max(weights.get(key, 0.0), weight)
+        
+        for term in tokenize(article.title):
+            add("term", term, TITLE_TERM_WEIGHT)
+        for term in tokenize(article.summary):
+            add("term", term, SUMMARY_TERM_WEIGHT)
+        for entity in extract_entities(article.title):
+            add("entity", entity, TITLE_ENTITY_WEIGHT)
+        for entity in extract_entities(article.summary):
+            add("entity", entity, SUMMARY_ENTITY_WEIGHT)
+        
+        return weights
+    
+    async def update(self, db: AsyncSession, articles: List[Article]):
+        """Fold newly stored articles into the index and drop terms outside the window"""
+        now = datetime.utcnow()
+        cutoff = now - self.window
+        
+        # Aggregate in memory first so each term is written once per ingestion
+        contributions = {}
+        for article in articles:
+            at = min(article.published_at or now, now)
+            if at < cutoff:
+                continue
+            for key, weight in self.article_terms(article).items():
+                log_weight = self._log_weight(weight, at)
+                if key in contributions:
+                    entry = contributions[key]
+                    entry[0] = _logaddexp(entry[0], log_weight)
+                    entry[1] += 1
+                    entry[2] = max(entry[2], at)
+                else:
+                    contributions[key] = [log_weight, 1, at]
+        
+        keys = list(contributions)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            result = await db.execute(select(TrendingTerm).where(
+                tuple_(TrendingTerm.kind, TrendingTerm.term).in_(chunk)
+            ))
+            existing = {(row.kind, row.term): row for row in result.scalars()}
+            for key in chunk:
+                log_weight, count, at = contributions[key]
+                row = existing.get(key)
+                if row:
+                    row.log_score = _logaddexp(row.log_score, log_weight)
+                    row.article_count += count
+                    row.last_seen_at = max(row.last_seen_at, at)
+                else:
+                    db.add(TrendingTerm(
+                        kind=key[0],
+                        term=key[1],
+                        log_score=log_weight,
+                        article_count=count,
+                        last_seen_at=at
+                    ))
+        
+        result = await db.execute(
+            delete(TrendingTerm)
+            .where(TrendingTerm.last_seen_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        
+        logger.info(f"Trending index updated: {len(keys)} terms touched, {result.rowcount} expired")
+    
+    async def top(self, db: AsyncSession, limit: int = 10) -> List[Dict]:
+        """Highest-scoring topics right now, with their decayed scores"""
+        now_log = self.decay_rate * (datetime.utcnow() - EPOCH).total_seconds()
+        result = await db.execute(select(TrendingTerm).order_by(TrendingTerm.log_score.desc()).limit(limit))
+        rows = result.scalars().all()
+        
+        return [
+            {
+                "topic": row.term,
+                "kind": row.kind,
+                "score": round(math.exp(row.log_score - now_log), 4),
+                "articles": row.article_count,
+            }
+            for row in rows
+        ]
+
+# Global instance
+trending_service = TrendingService()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark article ingestion: the old per-article dedup loop against the
+set-based bulk path in IngestionService.save_articles.
+
+Usage:
+    python -m benchmarks.ingestion [--sizes 10 100 1000 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.core.database import Base
+from backend.models.models import Article
+from backend.schemas.schemas import ArticleCreate
+from backend.services.ingestion_service import ingestion_service
+
+def make_articles(count, offset=0):
+    """Synthetic fetched articles, roughly NewsAPI-sized"""
+    return [
+        ArticleCreate(
+            title=f"Synthetic headline number {offset + i}",
+            content="Body text " * 50,
+            summary="A short description of the story.",
+            source=f"Source {i % 5}",
+            category="general",
+            url=f"https://example.com/story/{offset + i}",
+        )
+        for i in range(count)
+    ]
+
+def legacy_save(db, articles):
+    """The original refresh_news loop: one SELECT and one add per article"""
+    saved = 0
+    for article_data in articles:
+        existing = db.query(Article).filter(
+            Article.title == article_data.title,
+            Article.source == article_data.source
+        ).first()
+        if not existing:
+            db.add(Article(**article_data.dict()))
+            saved += 1
+    db.commit()
+    return saved
+
+def fresh_session(directory, name):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+def fresh_async_session(directory, name):
+    fresh_session(directory, name).close()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, name)}")
+    return async_sessionmaker(bind=engine, expire_on_commit=False)()
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+async def timed_async(fn, *args):
+    start = time.perf_counter()
+    await fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+async def benchmark(sizes):
+    print(f"{'batch':>7} | {'legacy new':>11} | {'bulk new':>9} | {'legacy dup':>11} | {'bulk dup':>9}")
+    print("-" * 60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            # Seed both databases with an existing corpus so dedup has work to do
+            seed = make_articles(size, offset=10 * size)
+            batch = make_articles(size)
+
+            legacy_db = fresh_session(directory, f"legacy_{size}.db")
+            bulk_db = fresh_async_session(directory, f"bulk_{size}.db")
+            legacy_save(legacy_db, seed)
+            await ingestion_service.save_articles(bulk_db, seed)
+
+            # First pass stores everything, second pass is all duplicates
+            legacy_new = timed(legacy_save, legacy_db, batch)
+            bulk_new = await timed_async(ingestion_service.save_articles, bulk_db, batch)
+            legacy_dup = timed(legacy_save, legacy_db, batch)
+            bulk_dup = await timed_async(ingestion_service.save_articles, bulk_db, batch)
+
+            print(f"{size:>7} | {legacy_new:>9.1f}ms | {bulk_new:>7.1f}ms | {legacy_dup:>9.1f}ms | {bulk_dup:>7.1f}ms")
+
+            legacy_db.close()
+            await bulk_db.close()
+            await bulk_db.bind.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.sizes))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Load-test the API fully offline. Boots the app under uvicorn against local
+stand-ins for OpenAI, NewsAPI and the Guardian, drives a weighted mix of
+briefing, chat and article traffic from concurrent virtual users, and
+reports throughput and p50/p95/p99 latency per endpoint.
+
+Usage:
+    python -m benchmarks.load_test [--duration 30] [--users 20] [--workers 1]
+        [--llm-latency 0.8] [--token-delay 0.02] [--llm-error-rate 0]
+        [--news-latency 0.05] [--news-error-rate 0]
+        [--mix briefing=2,personal_briefing=1,chat=2,chat_stream=1,articles=4,search=1,summary=1]
+        [--json baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.stub_servers import StubServer, _free_port, create_news_stub_app, create_openai_stub_app
+from backend.core.migrations import run_migrations
+
+DEFAULT_MIX = "briefing=2,personal_briefing=1,chat=2,chat_stream=1,articles=4,search=1,summary=1"
+QUESTIONS = [
+    "What's going on with the markets today?",
+    "Give me the short version of the top story.",
+    "Anything new in technology?",
+    "Why does the climate deal matter?",
+    "What should I read first this morning?",
+    "Summarize the world news for me.",
+]
+SEARCH_TERMS = ["headline", "report", "business", "technology", "world", "story"]
+PROFILES = [
+    (["general", "business", "technology"], "casual"),
+    (["technology", "science"], "professional"),
+    (["sports", "entertainment"], "humorous"),
+    (["world", "politics"], "serious"),
+]
+
+class Recorder:
+    """Latency samples and failures per endpoint"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.first_error = {}
+
+    def add(self, name, started, ok, detail=None):
+        self.samples[name].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            self.errors[name] += 1
+            self.first_error.setdefault(name, detail)
+
+    async def request(self, client, name, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.add(name, started, False, repr(e))
+            return None
+        ok = response.status_code < 400
+        self.add(name, started, ok, None if ok else f"{response.status_code} {response.text[:200]}")
+        return response if ok else None
+
+def percentile(timings, fraction):
+    """Nearest-rank percentile of sorted timings"""
+    return timings[min(len(timings) - 1, max(0, int(round(fraction * len(timings))) - 1))]
+
+class VirtualUser:
+    """One simulated client with its own preferences and chat session"""
+
+    def __init__(self, index, rng, article_ids):
+        self.user_id = f"load-user-{index}"
+        self.rng = rng
+        self.article_ids = article_ids
+        self.session_id = None
+
+    def chat_payload(self):
+        # Most follow-ups continue the conversation, some start a new one
+        if self.session_id and self.rng.random() < 0.3:
+            self.session_id = None
+        payload = {"message": self.rng.choice(QUESTIONS), "user_id": self.user_id}
+        if self.session_id:
+            payload["session_id"] = self.session_id
+        return payload
+
+    async def briefing(self, client, recorder):
+        await recorder.request(client, "GET /api/news/briefing", "GET", "/api/news/briefing")
+
+    async def personal_briefing(self, client, recorder):
+        await recorder.request(
+            client, "GET /api/news/briefing?user_id", "GET", "/api/news/briefing", params={"user_id": self.user_id}
+        )
+
+    async def chat(self, client, recorder):
+        response = await recorder.request(client, "POST /api/chat/message", "POST", "/api/chat/message", json=self.chat_payload())
+        if response is not None:
+            self.session_id = response.json()["session_id"]
+
+    async def chat_stream(self, client, recorder):
+        started = time.perf_counter()
+        first_token, error, event = False, None, None
+        try:
+            async with client.stream("POST", "/api/chat/message/stream", json=self.chat_payload()) as response:
+                if response.status_code >= 400:
+                    error = f"{response.status_code} {(await response.aread())[:200]}"
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                        if event == "token" and not first_token:
+                            first_token = True
+                            recorder.add("POST /api/chat/message/stream (first token)", started, True)
+                    elif line.startswith("data: "):
+                        data = json.loads(line[len("data: "):])
+                        if event == "error":
+                            error = data.get("detail")
+                        elif event == "session":
+                            self.session_id = data["session_id"]
+        except httpx.HTTPError as e:
+            error = repr(e)
+        recorder.add("POST /api/chat/message/stream", started, error is None, error)
+
+    async def articles(self, client, recorder):
+        await recorder.request(client, "GET /api/news/articles", "GET", "/api/news/articles", params={"limit": 20})
+
+    async def search(self, client, recorder):
+        await recorder.request(
+            client, "GET /api/news/search", "GET", "/api/news/search", params={"q": self.rng.choice(SEARCH_TERMS)}
+        )
+
+    async def summary(self, client, recorder):
+        if self.article_ids:
+            article_id = self.rng.choice(self.article_ids)
+            await recorder.request(
+                client, "GET /api/news/article/{id}/summary", "GET", f"/api/news/article/{article_id}/summary"
+            )
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if not hasattr(VirtualUser, name.strip()):
+            raise SystemExit(f"Unknown scenario in --mix: {name}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+def start_app(port, env, workers):
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("App did not become healthy within 60s")
+
+async def seed(client, users):
+    """Ingest news from the stubs and give every virtual user preferences"""
+    response = await client.post("/api/news/refresh")
+    response.raise_for_status()
+    print(f"  seeded news: {response.json()}")
+
+    for index in range(users):
+        categories, tone = PROFILES[index % len(PROFILES)]
+        await client.post("/api/user/preferences", json={
+            "user_id": f"load-user-{index}",
+            "preferred_categories": categories,
+            "tone_preference": tone,
+            "briefing_time": "08:00",
+        })
+
+    response = await client.get("/api/news/articles", params={"limit": 100, "fields": "id"})
+    return [row["id"] for row in response.json()]
+
+async def drive(base_url, users, duration, weights, seed_value):
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        article_ids = await seed(client, users)
+        recorder = Recorder()
+        scenarios, scenario_weights = list(weights), list(weights.values())
+        deadline = time.monotonic() + duration
+
+        async def run_user(index):
+            user = VirtualUser(index, random.Random(seed_value + index), article_ids)
+            while time.monotonic() < deadline:
+                scenario = user.rng.choices(scenarios, scenario_weights)[0]
+                await getattr(user, scenario)(client, recorder)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[run_user(index) for index in range(users)])
+        return recorder, time.perf_counter() - started
+
+def report(recorder, elapsed, llm_stats):
+    rows = []
+    print(f"\n{'endpoint':<46} | {'reqs':>6} | {'err':>4} | {'req/s':>7} | {'p50':>8} | {'p95':>8} | {'p99':>8}")
+    print("-" * 106)
+    for name in sorted(recorder.samples):
+        timings = sorted(recorder.samples[name])
+        row = {
+            "endpoint": name,
+            "requests": len(timings),
+            "errors": recorder.errors[name],
+            "rps": round(len(timings) / elapsed, 2),
+            "p50_ms": round(percentile(timings, 0.50), 2),
+            "p95_ms": round(percentile(timings, 0.95), 2),
+            "p99_ms": round(percentile(timings, 0.99), 2),
+        }
+        rows.append(row)
+        print(f"{name:<46} | {row['requests']:>6} | {row['errors']:>4} | {row['rps']:>7.2f} | "
+              f"{row['p50_ms']:>6.1f}ms | {row['p95_ms']:>6.1f}ms | {row['p99_ms']:>6.1f}ms")
+
+    # The first-token rows are extra samples of stream requests, not extra requests
+    total = sum(row["requests"] for row in rows if not row["endpoint"].endswith("(first token)"))
+    print("-" * 106)
+    for name, detail in sorted(recorder.first_error.items()):
+        print(f"first error from {name}: {detail}")
+    print(f"{total} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s; "
+          f"upstream LLM calls: {llm_stats['requests']} ({llm_stats['streamed']} streamed, {llm_stats['errors']} failed)")
+    return {"elapsed_seconds": round(elapsed, 2), "requests": total, "endpoints": rows, "llm": dict(llm_stats)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load after seeding")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight pairs")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="seconds before a completion (or its first token)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--news-latency", type=float, default=0.05)
+    parser.add_argument("--news-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the results to this file, e.g. as a baseline")
+    args = parser.parse_args()
+    weights = parse_mix(args.mix)
+
+    openai_app = create_openai_stub_app(
+        latency=args.llm_latency, error_rate=args.llm_error_rate, token_delay=args.token_delay
+    )
+    news_app = create_news_stub_app(latency=args.news_latency, error_rate=args.news_error_rate)
+
+    with tempfile.TemporaryDirectory() as directory, StubServer(openai_app) as openai_stub, StubServer(news_app) as news_stub:
+        database_url = f"sqlite:///{os.path.join(directory, 'load.db')}"
+        # Migrate once up front so several workers don't race to do it
+        run_migrations(database_url)
+
+        env = dict(
+            os.environ,
+            DATABASE_URL=database_url,
+            OPENAI_API_KEY="stub",
+            OPENAI_BASE_URL=f"{openai_stub.url}/v1",
+            NEWS_API_KEY="stub",
+            NEWS_API_BASE_URL=f"{news_stub.url}/v2",
+            GUARDIAN_API_KEY="stub",
+            GUARDIAN_API_BASE_URL=news_stub.url,
+            NEWS_REFRESH_ENABLED="false",
+            PERSONALIZED_BRIEFING_ENABLED="false",
+        )
+        port = _free_port()
+        print(f"Load test: {args.users} users for {args.duration:.0f}s against {args.workers} worker(s), mix {args.mix}")
+        process = start_app(port, env, args.workers)
+        try:
+            recorder, elapsed = asyncio.run(
+                drive(f"http://127.0.0.1:{port}", args.users, args.duration, weights, args.seed)
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+        results = report(recorder, elapsed, openai_app.state.stats)
+        results["config"] = vars(args)
+        if args.json:
+            with open(args.json, "w") as handle:
+                json.dump(results, handle, indent=2)
+            print(f"Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
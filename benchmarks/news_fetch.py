@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark upstream news fetching against local stub servers: a fresh
+httpx client per request (the old behaviour) versus NewsService's pooled
+keep-alive client.
+
+Usage:
+    python -m benchmarks.news_fetch [--sections 20] [--rounds 5] [--latency 0.02]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks.stub_servers import StubServer, create_news_stub_app
+from backend.services.news_service import NewsService
+
+async def fetch_with_fresh_client(service, section):
+    """Mirror of fetch_guardian_articles before the shared client existed"""
+    params = {
+        "api-key": service.guardian_api_key,
+        "show-fields": "headline,trailText,body,thumbnail",
+        "page-size": 20,
+        "order-by": "newest",
+        "section": section,
+    }
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{service.guardian_api_base}/search", params=params)
+        response.raise_for_status()
+        return response.json()["response"]["results"]
+
+async def run_rounds(fetch, sections, rounds):
+    start = time.perf_counter()
+    fetched = 0
+    for _ in range(rounds):
+        results = await asyncio.gather(*[fetch(section) for section in sections])
+        fetched += sum(len(result) for result in results)
+    return time.perf_counter() - start, fetched
+
+async def benchmark(stub_url, sections, rounds):
+    service = NewsService()
+    service.guardian_api_key = "stub"
+    service.guardian_api_base = stub_url
+
+    fresh_time, fresh_count = await run_rounds(
+        lambda section: fetch_with_fresh_client(service, section), sections, rounds
+    )
+
+    await service.startup()
+    try:
+        pooled_time, pooled_count = await run_rounds(service.fetch_guardian_articles, sections, rounds)
+    finally:
+        await service.shutdown()
+
+    print(f"{'client':>12} | {'wall time':>10} | {'articles':>8}")
+    print("-" * 38)
+    print(f"{'per-request':>12} | {fresh_time * 1000:>8.1f}ms | {fresh_count:>8}")
+    print(f"{'pooled':>12} | {pooled_time * 1000:>8.1f}ms | {pooled_count:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=20, help="sections fetched concurrently per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub response latency in seconds")
+    args = parser.parse_args()
+
+    sections = [f"section-{i}" for i in range(args.sections)]
+    with StubServer(create_news_stub_app(latency=args.latency)) as stub:
+        asyncio.run(benchmark(stub.url, sections, args.rounds))
+
+if __name__ == "__main__":
+    main()
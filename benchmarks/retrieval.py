@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark chat context retrieval: build the in-memory BM25 index over
+synthetic articles and time queries against it.
+
+Usage:
+    python -m benchmarks.retrieval [--articles 100000] [--queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from backend.services.retrieval_service import ArticleIndex
+
+TOPICS = [
+    "federal reserve interest rates inflation", "election campaign senate votes",
+    "climate summit emissions targets", "tech earnings cloud revenue",
+    "oil prices opec supply", "premier league transfer window",
+    "vaccine trial results", "housing market mortgage demand",
+    "supply chain shipping delays", "artificial intelligence regulation",
+]
+FILLER = "markets analysts report growth policy officials weekly global local city company".split()
+
+def synthetic_article(rng, i):
+    topic = rng.choice(TOPICS).split()
+    title = " ".join(rng.sample(topic, k=min(3, len(topic))) + [f"story{i % 5000}"])
+    body = " ".join(rng.choice(topic + FILLER) for _ in range(40))
+    return title, body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = ArticleIndex()
+    start = time.perf_counter()
+    for i in range(args.articles):
+        index.add(i + 1, *synthetic_article(rng, i))
+    build_time = time.perf_counter() - start
+
+    queries = [f"what is happening with {rng.choice(TOPICS)} today" for _ in range(args.queries)]
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k=5)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    print(f"Indexed {len(index)} articles in {build_time:.1f}s ({len(index.postings)} terms)")
+    print(f"Query latency over {len(timings)} queries: "
+          f"p50 {statistics.median(timings):.2f}ms, "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f}ms, "
+          f"max {timings[-1]:.2f}ms")
+
+if __name__ == "__main__":
+    main()
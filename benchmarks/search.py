@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/news/search's query path on a synthetic corpus: load
+articles into a migrated SQLite database (FTS5 kept in sync by the insert
+triggers) and time ranked, highlighted first and follow-up pages against
+an unindexed LIKE scan.
+
+Usage:
+    python -m benchmarks.search [--articles 1000000] [--queries 50] [--db path]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.core.database import async_database_url
+from backend.core.migrations import run_migrations
+from backend.models.models import Article
+from backend.services.search_service import search_service
+
+VOCABULARY = (
+    "federal reserve interest rates inflation election senate vote climate summit emissions "
+    "earnings cloud revenue oil opec supply football transfer vaccine trial housing mortgage "
+    "shipping delays regulation court ruling strike union wages tariffs trade exports energy "
+    "drought wildfire storm flood merger acquisition startup funding layoffs budget deficit "
+    "ceasefire talks protest minister parliament budget launch satellite rocket research"
+).split()
+FILLER = "the a of to in and on for with as at by from said after over new more".split()
+QUERIES = ["interest rates", "climate summit", "oil opec", "housing mortgage", "ceasefire talks",
+           "startup funding layoffs", "vaccine", "wildfire storm", "merger acquisition", "court ruling strike"]
+
+def synthetic_rows(rng, start, count):
+    rows = []
+    for i in range(start, start + count):
+        topic = rng.sample(VOCABULARY, 4)
+        words = [rng.choice(topic + FILLER) for _ in range(60)]
+        rows.append({
+            "title": " ".join(rng.sample(topic, 3)).capitalize() + f" {i}",
+            "summary": " ".join(words[:20]),
+            "content": f"<p>{' '.join(words)}</p>",
+            "source": f"Source {i % 7}",
+            "category": "general",
+            "url": f"https://example.com/{i}",
+            "dedup_key": f"{i:040d}",
+        })
+    return rows
+
+def load_corpus(database_url, count, batch=20_000):
+    engine = create_engine(database_url)
+    rng = random.Random(7)
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        existing = connection.execute(text("SELECT count(*) FROM articles")).scalar()
+    for offset in range(existing, count, batch):
+        with engine.begin() as connection:
+            connection.execute(insert(Article), synthetic_rows(rng, offset, min(batch, count - offset)))
+        print(f"\r  loaded {min(offset + batch, count):,} / {count:,}", end="", flush=True)
+    print(f"\r  loaded {count:,} articles in {time.perf_counter() - start:.1f}s")
+    engine.dispose()
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return (f"p50 {statistics.median(timings):7.2f}ms  "
+            f"p95 {timings[max(0, int(len(timings) * 0.95) - 1)]:7.2f}ms  "
+            f"max {timings[-1]:7.2f}ms")
+
+async def time_queries(database_url, queries):
+    engine = create_async_engine(async_database_url(database_url))
+    first, follow_up, like = [], [], []
+    async with AsyncSession(engine) as db:
+        for query in queries:
+            start = time.perf_counter()
+            results, has_more = await search_service.search(db, query, limit=20)
+            first.append((time.perf_counter() - start) * 1000)
+
+            if has_more:
+                after = {"score": results[-1]["score"], "id": results[-1]["id"]}
+                start = time.perf_counter()
+                await search_service.search(db, query, limit=20, after=after)
+                follow_up.append((time.perf_counter() - start) * 1000)
+
+        # The ad-hoc alternative, for comparison; a handful is enough
+        for query in queries[:5]:
+            start = time.perf_counter()
+            await db.execute(
+                text("SELECT id FROM articles WHERE content LIKE :pattern ORDER BY created_at DESC LIMIT 20"),
+                {"pattern": f"%{query}%"},
+            )
+            like.append((time.perf_counter() - start) * 1000)
+    await engine.dispose()
+    return first, follow_up, like
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--db", help="Reuse (or create) this SQLite file instead of a temporary one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.db or os.path.join(directory, "search.db")
+        database_url = f"sqlite:///{path}"
+        run_migrations(database_url)
+        load_corpus(database_url, args.articles)
+
+        queries = [random.choice(QUERIES) for _ in range(args.queries)]
+        first, follow_up, like = asyncio.run(time_queries(database_url, queries))
+
+        print(f"{'query':>18} | latency over {len(queries)} queries")
+        print("-" * 70)
+        print(f"{'FTS first page':>18} | {percentiles(first)}")
+        if follow_up:
+            print(f"{'FTS next page':>18} | {percentiles(follow_up)}")
+        print(f"{'LIKE scan':>18} | {percentiles(like)}")
+
+if __name__ == "__main__":
+    main()
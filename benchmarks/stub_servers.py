@@ -0,0 +1,188 @@
+"""
+Local stand-ins for the upstream news APIs and the OpenAI chat completions
+API, for offline benchmarks and load tests.
+
+Each stub is a small FastAPI app served by uvicorn on a background thread,
+with configurable per-request latency and error rate.
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+def _timestamp(minutes_ago):
+    moment = datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def create_news_stub_app(latency=0.0, error_rate=0.0, page_size=20):
+    """App answering NewsAPI /v2/top-headlines and Guardian /search"""
+    app = FastAPI()
+
+    async def simulate_upstream():
+        if latency:
+            await asyncio.sleep(latency)
+        if error_rate and random.random() < error_rate:
+            raise HTTPException(status_code=503, detail="Stub upstream error")
+
+    @app.get("/v2/top-headlines")
+    async def top_headlines(category: str = "general", pageSize: int = page_size):
+        await simulate_upstream()
+        return {
+            "status": "ok",
+            "totalResults": pageSize,
+            "articles": [
+                {
+                    "source": {"id": None, "name": f"Stub Wire {i % 4}"},
+                    "title": f"{category.title()} headline {i}",
+                    "description": f"What happened in {category} story {i}.",
+                    "content": f"Full text of {category} story {i}. " * 20,
+                    "url": f"https://stub.newsapi.local/{category}/{i}",
+                    "publishedAt": _timestamp(i * 5),
+                }
+                for i in range(pageSize)
+            ],
+        }
+
+    @app.get("/search")
+    async def guardian_search(section: str = "world"):
+        await simulate_upstream()
+        return {
+            "response": {
+                "status": "ok",
+                "results": [
+                    {
+                        "sectionName": section.title(),
+                        "webTitle": f"{section.title()} report {i}",
+                        "webUrl": f"https://stub.guardian.local/{section}/{i}",
+                        "webPublicationDate": _timestamp(i * 7),
+                        "fields": {
+                            "headline": f"{section.title()} report {i}",
+                            "trailText": f"The {section} desk on story {i}.",
+                            "body": f"<p>Body of {section} report {i}.</p>" * 20,
+                        },
+                    }
+                    for i in range(page_size)
+                ],
+            }
+        }
+
+    return app
+
+STUB_REPLY = (
+    "Good morning! Markets are steady, the climate summit wrapped up with a new "
+    "emissions deal, and tech earnings beat expectations. Want the details on any of these?"
+)
+
+def create_openai_stub_app(latency=0.0, error_rate=0.0, token_delay=0.0, reply=STUB_REPLY):
+    """App answering OpenAI POST /v1/chat/completions, plain and streamed
+
+    ``latency`` is the wait before the response (time to first token when
+    streaming) and ``token_delay`` the gap between streamed tokens. Calls
+    and token counts are tallied in ``app.state.stats``.
+    """
+    app = FastAPI()
+    app.state.stats = {"requests": 0, "streamed": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    # Streamed one word per chunk, the way real deltas carry their leading space
+    words = reply.split()
+    tokens = [words[0]] + [" " + word for word in words[1:]] if words else [reply]
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats = app.state.stats
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        if error_rate and random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "Stub upstream error", "type": "server_error", "code": None}},
+                status_code=500,
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4")
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in body.get("messages", [])) // 4
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += len(tokens)
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens),
+                },
+            }
+
+        stats["streamed"] += 1
+
+        def chunk(delta, finish_reason=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                if token_delay:
+                    await asyncio.sleep(token_delay)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class StubServer:
+    """Run an ASGI app on a local port for the duration of a ``with`` block"""
+
+    def __init__(self, app, port=None):
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Stub server on port {self.port} did not start")
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
@@ -0,0 +1,77 @@
+"""
+Shared fixtures. Settings, engines and services are created at import time,
+so the environment is pointed at a throwaway SQLite database before anything
+from backend is imported.
+"""
+
+import os
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix="morning-news-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_directory, 'test.db')}"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["NEWS_REFRESH_ENABLED"] = "false"
+os.environ["PERSONALIZED_BRIEFING_ENABLED"] = "false"
+
+import httpx
+import pytest
+
+from backend.core.database import AsyncSessionLocal, Base, async_engine, engine
+from backend.core.migrations import run_migrations
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    run_migrations(os.environ["DATABASE_URL"])
+    yield
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+async def clean_database():
+    """Empty every table after each test; pooled async connections belong to the test's event loop"""
+    # Connect once up front: the pool's first connect isn't safe to run concurrently
+    async with async_engine.connect():
+        pass
+    yield
+    await async_engine.dispose()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+@pytest.fixture
+async def db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+@pytest.fixture
+async def client():
+    """Client calling the app in-process, without running its startup tasks"""
+    from backend.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Point ai_service at an in-process OpenAI stub; returns a factory taking the stub's options
+
+    The messages of every prompt sent are collected in ``stub.state.prompts``.
+    """
+    import json
+    from openai import AsyncOpenAI
+    from backend.services.ai_service import ai_service
+    from benchmarks.stub_servers import create_openai_stub_app
+
+    def start(**options):
+        stub = create_openai_stub_app(**options)
+        stub.state.prompts = []
+
+        async def record(request):
+            stub.state.prompts.append(json.loads(request.content)["messages"])
+
+        http_client = httpx.AsyncClient(app=stub, base_url="http://openai-stub", event_hooks={"request": [record]})
+        client = AsyncOpenAI(api_key="stub", base_url="http://openai-stub/v1", http_client=http_client, max_retries=0)
+        monkeypatch.setattr(ai_service, "client", client)
+        return stub
+
+    return start
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from backend.schemas.schemas import Article
+
+def make_article(article_id: int, title: str = None, **fields) -> Article:
+    """An Article schema as the routes hand it to the services"""
+    fields.setdefault("summary", f"Summary of story {article_id}.")
+    fields.setdefault("content", f"Full text of story {article_id}.")
+    fields.setdefault("source", "Stub Wire")
+    fields.setdefault("category", "general")
+    fields.setdefault("created_at", datetime(2026, 10, 17, 7, 0))
+    return Article(id=article_id, title=title or f"Headline {article_id}", **fields)
@@ -0,0 +1,68 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services.ai_service import AIService
+from tests.factories import make_article
+
+def completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+class FakeCompletions:
+    """Stands in for ``AIService._complete``; ``reply`` maps a batch's article IDs to the response text"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.batches = []
+
+    async def __call__(self, operation, messages, **kwargs):
+        ids = [int(article_id) for article_id in re.findall(r"\[id=(\d+)\]", messages[-1]["content"])]
+        self.batches.append(ids)
+        return completion(self.reply(ids, len(self.batches)))
+
+def summaries(ids, skip=()):
+    return json.dumps([{"id": article_id, "summary": f"Summary {article_id}"} for article_id in ids if article_id not in skip])
+
+@pytest.fixture
+def service():
+    return AIService()
+
+async def test_packs_articles_into_batches(service, monkeypatch):
+    fake = FakeCompletions(lambda ids, call: summaries(ids))
+    monkeypatch.setattr(service, "_complete", fake)
+
+    results = await service.summarize_articles([make_article(i) for i in range(1, 6)], max_articles=2)
+    assert results == {i: f"Summary {i}" for i in range(1, 6)}
+    assert sorted(fake.batches) == [[1, 2], [3, 4], [5]]
+
+async def test_retries_only_articles_missing_from_the_output(service, monkeypatch):
+    fake = FakeCompletions(lambda ids, call: summaries(ids, skip={3} if call == 1 else ()))
+    monkeypatch.setattr(service, "_complete", fake)
+
+    results = await service.summarize_articles([make_article(i) for i in range(1, 5)], max_articles=10)
+    assert set(results) == {1, 2, 3, 4}
+    assert fake.batches == [[1, 2, 3, 4], [3]]
+
+async def test_retries_unparseable_batches_up_to_max_retries(service, monkeypatch):
+    fake = FakeCompletions(lambda ids, call: "Sorry, I can't help with that.")
+    monkeypatch.setattr(service, "_complete", fake)
+
+    results = await service.summarize_articles([make_article(i) for i in range(1, 5)], max_articles=10, max_retries=2)
+    assert results == {}
+    assert fake.batches == [[1, 2, 3, 4]] * 3
+
+async def test_gives_up_on_transport_errors(service, monkeypatch):
+    calls = []
+
+    async def unavailable(operation, **kwargs):
+        calls.append(operation)
+        raise ConnectionError("OpenAI is down")
+
+    monkeypatch.setattr(service, "_complete", unavailable)
+
+    results = await service.summarize_articles([make_article(i) for i in range(1, 9)], max_articles=4, max_retries=2)
+    assert results == {}
+    # One call per batch; the client's own retries are the only ones
+    assert len(calls) == 2
@@ -0,0 +1,57 @@
+import pytest
+
+from backend.core.cache import MemoryCache, RedisCache, fingerprint
+from backend.services.ai_service import ai_service
+from backend.services.briefing_service import BriefingService
+from benchmarks.stub_servers import _free_port
+from tests.factories import make_article
+
+@pytest.fixture
+def unreachable_redis():
+    """A RedisCache pointed at a port nothing listens on"""
+    return RedisCache("test", url=f"redis://127.0.0.1:{_free_port()}/0")
+
+def test_fingerprint_ignores_order_unless_asked():
+    assert fingerprint([1, 2, 3]) == fingerprint([3, 2, 1])
+    assert fingerprint([1, 2, 3], ordered=True) != fingerprint([3, 2, 1], ordered=True)
+
+async def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache("test", maxsize=2, ttl=60)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("a") == 1
+    assert await cache.get("b") is None
+    assert await cache.get("c") == 3
+
+async def test_memory_cache_expires_entries():
+    cache = MemoryCache("test", maxsize=2, ttl=0)
+    await cache.set("a", 1)
+    assert await cache.get("a") is None
+
+async def test_unreachable_redis_is_a_miss(unreachable_redis):
+    await unreachable_redis.set("key", {"value": 1})
+    assert await unreachable_redis.get("key") is None
+    await unreachable_redis.delete("key")
+    await unreachable_redis.clear()
+
+async def test_briefing_is_generated_when_redis_is_down(unreachable_redis, monkeypatch):
+    calls = []
+
+    async def generate(articles, fallback=True):
+        calls.append([article.id for article in articles])
+        return "Your morning briefing."
+
+    monkeypatch.setattr(ai_service, "generate_morning_briefing", generate)
+    service = BriefingService()
+    service.cache = unreachable_redis
+
+    summary, _ = await service.get_briefing([make_article(1), make_article(2)])
+    assert summary == "Your morning briefing."
+    assert calls == [[1, 2]]
+
+def test_briefing_key_follows_prompt_order():
+    service = BriefingService()
+    first, second = make_article(1), make_article(2)
+    assert service.cache_key([first, second]) != service.cache_key([second, first])
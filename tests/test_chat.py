@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from backend.models.models import Conversation, Message
+
+async def test_message_saves_both_turns(client, db, openai_stub):
+    openai_stub(reply="Markets are steady.")
+    response = await client.post("/api/chat/message", json={"message": "How are the markets?", "user_id": "u1"})
+    assert response.status_code == 200
+    assert response.json()["response"] == "Markets are steady."
+
+    conversation = (await db.execute(select(Conversation))).scalars().one()
+    roles = (await db.execute(select(Message.role).order_by(Message.id))).scalars().all()
+    assert roles == ["user", "assistant"]
+    assert conversation.message_count == 2
+
+async def test_prompts_carry_each_turn_once(client, openai_stub):
+    stub = openai_stub(reply="Markets are steady.")
+    first = await client.post("/api/chat/message", json={"message": "How are the markets?", "user_id": "u1"})
+    session_id = first.json()["session_id"]
+    await client.post("/api/chat/message", json={"message": "What about bonds?", "session_id": session_id})
+    async with client.stream("POST", "/api/chat/message/stream", json={"message": "And oil?", "session_id": session_id}) as response:
+        await response.aread()
+
+    turns = [[(message["role"], message["content"]) for message in prompt if message["role"] != "system"] for prompt in stub.state.prompts]
+    assert turns == [
+        [("user", "How are the markets?")],
+        [("user", "How are the markets?"), ("assistant", "Markets are steady."), ("user", "What about bonds?")],
+        [
+            ("user", "How are the markets?"), ("assistant", "Markets are steady."),
+            ("user", "What about bonds?"), ("assistant", "Markets are steady."),
+            ("user", "And oil?"),
+        ],
+    ]
+
+async def test_stream_saves_both_turns(client, db, openai_stub):
+    openai_stub(reply="Markets are steady.")
+    async with client.stream("POST", "/api/chat/message/stream", json={"message": "Markets?", "user_id": "u1"}) as response:
+        events = [line[len("event: "):] async for line in response.aiter_lines() if line.startswith("event: ")]
+    assert events[0] == "session" and events[-1] == "done"
+
+    conversation = (await db.execute(select(Conversation))).scalars().one()
+    assert conversation.message_count == 2
+
+async def test_concurrent_chats_do_not_wait_on_each_others_llm_calls(client, openai_stub):
+    # The user turn is committed before the LLM call, so no write lock is held during it
+    stub = openai_stub(latency=0.5, reply="Markets are steady.")
+
+    async def chat(index):
+        return await client.post("/api/chat/message", json={"message": f"Question {index}", "user_id": f"u{index}"})
+
+    async def stream(index):
+        async with client.stream("POST", "/api/chat/message/stream", json={"message": f"Stream {index}"}) as response:
+            body = (await response.aread()).decode()
+        return body
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*[chat(index) for index in range(6)])
+    bodies = await asyncio.gather(*[stream(index) for index in range(6)])
+    elapsed = time.perf_counter() - started
+
+    assert [response.status_code for response in responses] == [200] * 6
+    assert all("event: done" in body and "event: error" not in body for body in bodies)
+    assert stub.state.stats["requests"] == 12
+    # Two rounds of 0.5s LLM calls; serialized writes would take over 6s
+    assert elapsed < 3
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+
+from backend.models.models import Conversation, Message
+from backend.schemas.schemas import Message as MessageSchema
+from backend.services.ai_service import ai_service
+from backend.services.context_service import ContextService
+
+@pytest.fixture
+def service():
+    service = ContextService()
+    service.recent_messages = 2
+    service.summarize_every = 4
+    return service
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    calls = []
+
+    async def summarize(previous_summary, messages, max_tokens=300):
+        calls.append((previous_summary, [message.content for message in messages]))
+        return f"Summary of {len(messages)} messages"
+
+    monkeypatch.setattr(ai_service, "summarize_conversation", summarize)
+    return calls
+
+async def add_conversation(db, turns):
+    conversation = Conversation(session_id="s1", user_id="u1")
+    db.add(conversation)
+    await db.flush()
+    for index in range(turns):
+        db.add(Message(conversation_id=conversation.id, content=f"turn {index}", role="user" if index % 2 == 0 else "assistant"))
+    await db.commit()
+    return conversation
+
+async def reload(db, conversation):
+    conversation_id = conversation.id
+    db.expire_all()
+    return await db.get(Conversation, conversation_id)
+
+async def test_refresh_waits_until_enough_turns_pile_up(db, service, summarizer):
+    conversation = await add_conversation(db, 5)
+    await service.refresh(conversation.id)
+    assert summarizer == []
+    assert (await reload(db, conversation)).context_summary is None
+
+async def test_refresh_folds_all_but_the_recent_turns(db, service, summarizer):
+    conversation = await add_conversation(db, 6)
+    await service.refresh(conversation.id)
+
+    assert summarizer == [(None, ["turn 0", "turn 1", "turn 2", "turn 3"])]
+    conversation = await reload(db, conversation)
+    assert conversation.context_summary == "Summary of 4 messages"
+
+    context = await service.build(db, conversation)
+    assert context.summary == "Summary of 4 messages"
+    assert [message.content for message in context.history] == ["turn 4", "turn 5"]
+
+async def test_refresh_keeps_the_summary_when_the_ai_call_fails(db, service, monkeypatch):
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("OpenAI is down")
+
+    monkeypatch.setattr(ai_service, "summarize_conversation", unavailable)
+    conversation = await add_conversation(db, 8)
+    await service.refresh(conversation.id)
+
+    conversation = await reload(db, conversation)
+    assert conversation.context_summary is None
+    assert len((await service.build(db, conversation)).history) == 8
+
+async def test_refresh_does_not_overwrite_a_newer_summary(db, service, monkeypatch):
+    conversation = await add_conversation(db, 6)
+
+    async def summarize(previous_summary, messages, max_tokens=300):
+        # Another worker advances the summary while this one waits on the AI call
+        async with db.begin_nested():
+            stored = await db.get(Conversation, conversation.id)
+            stored.context_summary, stored.summarized_through_id = "Newer summary", messages[1].id
+        await db.commit()
+        return "Stale summary"
+
+    monkeypatch.setattr(ai_service, "summarize_conversation", summarize)
+    await service.refresh(conversation.id)
+    assert (await reload(db, conversation)).context_summary == "Newer summary"
+
+def test_fit_to_budget_keeps_the_newest_messages(service):
+    messages = [
+        MessageSchema(id=index, conversation_id=1, role="user", content="x" * 40, timestamp=datetime(2026, 1, 1))
+        for index in range(5)
+    ]
+    kept = service.fit_to_budget(messages, token_budget=25)
+    assert [message.id for message in kept] == [3, 4]
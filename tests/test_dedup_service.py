@@ -0,0 +1,79 @@
+import pytest
+
+from backend.models.models import Article
+from backend.services.dedup_service import DedupService
+
+STORY = (
+    "The central bank raised interest rates by a quarter point on Tuesday, citing persistent "
+    "inflation in services and a labour market that has stayed tighter than expected this year."
+)
+OTHER_STORY = (
+    "The home side clinched the title with a late winner, ending a decade-long wait for the "
+    "trophy in front of a sold-out stadium and thousands of fans celebrating outside."
+)
+
+@pytest.fixture
+def worker():
+    return DedupService()
+
+async def store(db, worker, title, body):
+    """Insert an article the way save_articles does: committed before linking"""
+    article = Article(
+        title=title, summary=body, source=title, dedup_key=title,
+        simhash=worker.fingerprint(title, body, None),
+    )
+    db.add(article)
+    await db.commit()
+    return article
+
+async def ingest(db, worker, *articles):
+    canonical = await worker.link(db, list(articles))
+    await db.commit()
+    worker.add(canonical)
+    return canonical
+
+async def test_links_copies_within_a_batch_to_the_earliest(db, worker):
+    first = await store(db, worker, "Rates rise", STORY)
+    copy = await store(db, worker, "Bank lifts rates", STORY + " Markets shrugged.")
+    other = await store(db, worker, "Title won", OTHER_STORY)
+
+    canonical = await ingest(db, worker, copy, first, other)
+    assert [article.id for article in canonical] == [first.id, other.id]
+    assert copy.canonical_id == first.id
+
+async def test_sees_articles_stored_by_another_worker(db, worker):
+    other_worker = DedupService()
+    await other_worker.rebuild()
+    await worker.rebuild()
+
+    first = await store(db, worker, "Rates rise", STORY)
+    await ingest(db, other_worker, first)
+
+    copy = await store(db, worker, "Bank lifts rates", STORY + " Markets shrugged.")
+    assert await ingest(db, worker, copy) == []
+    assert copy.canonical_id == first.id
+
+async def test_rolled_back_links_leave_no_index_entries(db, worker):
+    first = await store(db, worker, "Rates rise", STORY)
+    first_id, fingerprint = first.id, first.simhash
+    await worker.link(db, [first])
+    await db.rollback()
+    assert worker.index.find(fingerprint) is None
+
+    # Its row is still canonical, so the next batch catches up on it from the DB
+    copy = await store(db, worker, "Bank lifts rates", STORY + " Markets shrugged.")
+    assert await ingest(db, worker, copy) == []
+    assert copy.canonical_id == first_id
+
+async def test_follows_matches_another_worker_has_since_linked(db, worker):
+    original = await store(db, worker, "Rates rise", STORY)
+    stale = await store(db, worker, "Bank lifts rates", STORY + " Markets shrugged.")
+    # This worker indexed the copy before another worker linked it to the original
+    worker.add([stale])
+    stale.canonical_id = original.id
+    await db.commit()
+
+    # Closest to the stale copy, which must not become anyone's canonical article
+    copy = await store(db, worker, "Rates up again", STORY + " Markets shrugged.")
+    await ingest(db, worker, copy)
+    assert copy.canonical_id == original.id
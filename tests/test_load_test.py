@@ -0,0 +1,55 @@
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.load_test import parse_mix, percentile
+from benchmarks.stub_servers import create_news_stub_app, create_openai_stub_app
+
+def openai_client(app):
+    http_client = httpx.AsyncClient(app=app, base_url="http://stub")
+    return AsyncOpenAI(api_key="stub", base_url="http://stub/v1", http_client=http_client, max_retries=0)
+
+async def test_openai_stub_answers_plain_completions():
+    app = create_openai_stub_app(reply="Markets are steady today.")
+    response = await openai_client(app).chat.completions.create(
+        model="gpt-4", messages=[{"role": "user", "content": "How are the markets?"}]
+    )
+    assert response.choices[0].message.content == "Markets are steady today."
+    assert response.usage.completion_tokens == 4
+    assert app.state.stats["requests"] == 1
+    assert app.state.stats["streamed"] == 0
+
+async def test_openai_stub_streams_word_deltas():
+    app = create_openai_stub_app(reply="Markets are steady today.")
+    stream = await openai_client(app).chat.completions.create(
+        model="gpt-4", messages=[{"role": "user", "content": "How are the markets?"}], stream=True
+    )
+    deltas = [chunk.choices[0].delta.content async for chunk in stream if chunk.choices[0].delta.content]
+    assert deltas == ["Markets", " are", " steady", " today."]
+    assert app.state.stats["streamed"] == 1
+
+async def test_openai_stub_fails_at_the_configured_rate():
+    app = create_openai_stub_app(error_rate=1.0)
+    with pytest.raises(Exception):
+        await openai_client(app).chat.completions.create(model="gpt-4", messages=[{"role": "user", "content": "hi"}])
+    assert app.state.stats["errors"] == 1
+
+async def test_news_stub_serves_both_providers():
+    app = create_news_stub_app(page_size=3)
+    async with httpx.AsyncClient(app=app, base_url="http://stub") as client:
+        newsapi = (await client.get("/v2/top-headlines", params={"category": "business", "pageSize": 3})).json()
+        guardian = (await client.get("/search", params={"section": "world"})).json()
+    assert len(newsapi["articles"]) == 3
+    assert newsapi["articles"][0]["title"] == "Business headline 0"
+    assert len(guardian["response"]["results"]) == 3
+
+def test_percentile_uses_nearest_rank():
+    timings = [float(value) for value in range(1, 101)]
+    assert percentile(timings, 0.50) == 50.0
+    assert percentile(timings, 0.95) == 95.0
+    assert percentile([7.0], 0.99) == 7.0
+
+def test_parse_mix_rejects_unknown_scenarios():
+    assert parse_mix("chat=2,articles") == {"chat": 2.0, "articles": 1.0}
+    with pytest.raises(SystemExit):
+        parse_mix("chat=2,teleport=1")
@@ -0,0 +1,132 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.models.models import Article, PersonalizedBriefing, UserPreference
+from backend.services.ai_service import ai_service
+from backend.services.personalized_briefing_service import (
+    PersonalizedBriefingService,
+    next_briefing_at,
+    parse_briefing_time,
+    variant_of,
+)
+
+NOW = datetime(2026, 10, 17, 4, 0)
+
+@pytest.fixture
+def service():
+    return PersonalizedBriefingService()
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Records briefing generations; set ``llm.error`` to make them fail"""
+    class Calls(list):
+        error = None
+
+    calls = Calls()
+
+    async def generate(articles, fallback=True, tone=None):
+        calls.append((tone, [article.category for article in articles]))
+        if calls.error:
+            raise calls.error
+        return f"A {tone} briefing"
+
+    monkeypatch.setattr(ai_service, "generate_morning_briefing", generate)
+    return calls
+
+async def add_user(db, user_id, categories, tone="casual", briefing_time="08:00"):
+    db.add(UserPreference(
+        user_id=user_id, preferred_categories=json.dumps(categories),
+        tone_preference=tone, briefing_time=briefing_time,
+    ))
+    await db.commit()
+
+async def add_articles(db, *categories):
+    for index, category in enumerate(categories):
+        db.add(Article(title=f"{category} story {index}", source="Stub Wire", dedup_key=f"{category}-{index}", category=category))
+    await db.commit()
+
+async def stored_count(db):
+    return (await db.execute(select(func.count()).select_from(PersonalizedBriefing))).scalar()
+
+def test_equivalent_preferences_share_a_variant():
+    assert variant_of(["Tech", "business "], "Casual") == variant_of(["business", "tech"], None)
+    assert variant_of(["tech"], "casual").key != variant_of(["tech"], "formal").key
+
+def test_briefing_times():
+    assert parse_briefing_time("07:30") == time(7, 30)
+    assert parse_briefing_time("soon") == time(8, 0)
+    assert next_briefing_at(time(8, 0), NOW) == datetime(2026, 10, 17, 8, 0)
+    assert next_briefing_at(time(3, 0), NOW) == datetime(2026, 10, 18, 3, 0)
+
+def test_slots_are_stable_and_inside_the_window(service):
+    deadline = datetime(2026, 10, 17, 7, 45)
+    slots = {service.slot(variant_of([str(index)], "casual"), deadline.date(), deadline) for index in range(20)}
+    assert all(deadline - service.window <= slot <= deadline for slot in slots)
+    assert len(slots) == 20
+    variant = variant_of(["tech"], "casual")
+    assert service.slot(variant, deadline.date(), deadline) == service.slot(variant, deadline.date(), deadline)
+
+async def test_generates_each_variant_once_by_its_deadline(db, service, llm):
+    await add_articles(db, "technology", "business", "sports")
+    await add_user(db, "a", ["technology", "business"])
+    await add_user(db, "b", ["business", "technology"])
+    await add_user(db, "c", ["sports"], tone="humorous", briefing_time="09:00")
+
+    # Nothing is due before the window opens
+    assert (await service.run_once(NOW - timedelta(hours=3)))["generated"] == 0
+
+    deadline = datetime(2026, 10, 17, 8, 0) - service.min_lead
+    result = await service.run_once(deadline)
+    assert result == {"users": 3, "variants": 2, "generated": 2, "failed": 0}
+    assert sorted(tone for tone, _ in llm) == ["casual", "humorous"]
+    assert ("humorous", ["sports"]) in llm
+
+    # Stored variants aren't generated again
+    assert (await service.run_once(deadline))["generated"] == 0
+    assert await stored_count(db) == 2
+
+async def test_failed_variants_wait_before_retrying(db, service, llm):
+    await add_articles(db, "technology")
+    await add_user(db, "a", ["technology"])
+    deadline = datetime(2026, 10, 17, 8, 0) - service.min_lead
+
+    llm.error = ConnectionError("OpenAI is down")
+    started = datetime.now()
+    assert (await service.run_once(deadline))["failed"] == 1
+    [retry_at] = service._retry_at.values()
+    assert retry_at >= started + service.retry_delay
+
+    # Not retried before its retry time, even though the slot has passed
+    llm.error = None
+    service._retry_at = {key: deadline + timedelta(minutes=1) for key in service._retry_at}
+    assert (await service.run_once(deadline))["generated"] == 0
+    assert (await service.run_once(deadline + timedelta(minutes=1)))["generated"] == 1
+    assert len(llm) == 2
+    assert service._retry_at == {}
+
+async def test_serves_the_stored_briefing(db, service, llm):
+    await add_articles(db, "technology", "business")
+    await add_user(db, "stored-user", ["technology"])
+    await service.generate(variant_of(["technology"], "casual"), date.today())
+
+    summary, articles, _ = await service.get_for_user(db, "stored-user")
+    assert summary == "A casual briefing"
+    assert [article.category for article in articles] == ["technology"]
+    assert len(llm) == 1
+
+async def test_generates_on_demand_when_nothing_is_stored(db, service, llm):
+    await add_articles(db, "technology")
+    await add_user(db, "new-user", ["science"], tone="formal")
+
+    summary, articles, _ = await service.get_for_user(db, "new-user")
+    # No science stories yet, so it falls back to the latest of any category
+    assert summary == "A formal briefing"
+    assert [article.category for article in articles] == ["technology"]
+    assert await stored_count(db) == 1
+
+async def test_users_without_preferences_get_the_generic_briefing(db, service, llm):
+    assert await service.get_for_user(db, "unknown-user") is None
+    assert llm == []
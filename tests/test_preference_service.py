@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from backend.models.models import UserPreference
+from backend.services.preference_service import PreferenceService, decode_categories, preference_service
+
+@pytest.fixture
+async def preferences(monkeypatch):
+    """The shared preference cache, emptied and with fresh stats"""
+    await preference_service.cache.clear()
+    monkeypatch.setattr(preference_service, "stats", {"hits": 0, "misses": 0, "invalidations": 0})
+    yield preference_service
+    await preference_service.cache.clear()
+
+class CountingSession:
+    """Wraps a session and counts the queries run through it"""
+
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0
+
+    async def execute(self, *args, **kwargs):
+        self.queries += 1
+        return await self.db.execute(*args, **kwargs)
+
+async def add_user(db, user_id, categories):
+    db.add(UserPreference(
+        user_id=user_id, preferred_categories=json.dumps(categories), tone_preference="formal", briefing_time="07:15"
+    ))
+    await db.commit()
+
+@pytest.mark.parametrize("stored, categories", [
+    ('["tech", "science"]', ["tech", "science"]),
+    (None, []),
+    ("not json", []),
+    ('{"tech": true}', []),
+])
+def test_decode_categories(stored, categories):
+    assert decode_categories(stored) == categories
+
+async def test_second_lookup_is_served_from_the_cache(db):
+    service = PreferenceService()
+    await add_user(db, "cached-user", ["tech"])
+    session = CountingSession(db)
+
+    first = await service.get(session, "cached-user")
+    second = await service.get(session, "cached-user")
+    assert first == second
+    assert second.preferred_categories == ["tech"]
+    assert second.briefing_time == "07:15"
+    assert session.queries == 1
+    assert service.get_stats() == {"hits": 1, "misses": 1, "invalidations": 0, "hit_rate": 0.5}
+
+async def test_users_without_preferences_are_cached_too(db):
+    service = PreferenceService()
+    session = CountingSession(db)
+    assert await service.get(session, "nobody") is None
+    assert await service.get(session, "nobody") is None
+    assert session.queries == 1
+
+async def test_invalidate_reloads_from_the_database(db):
+    service = PreferenceService()
+    await add_user(db, "changing-user", ["tech"])
+    await service.get(db, "changing-user")
+
+    row = (await db.execute(select(UserPreference).where(UserPreference.user_id == "changing-user"))).scalar_one()
+    row.preferred_categories = json.dumps(["sports"])
+    await db.commit()
+    assert (await service.get(db, "changing-user")).preferred_categories == ["tech"]
+
+    await service.invalidate("changing-user")
+    assert (await service.get(db, "changing-user")).preferred_categories == ["sports"]
+    assert service.stats["invalidations"] == 1
+
+async def test_writes_through_the_api_invalidate(client, preferences):
+    payload = {"user_id": "api-user", "preferred_categories": ["tech"], "tone_preference": "casual", "briefing_time": "08:00"}
+    assert (await client.post("/api/user/preferences", json=payload)).status_code == 200
+    assert (await client.get("/api/user/preferences/api-user/categories")).json() == {"categories": ["tech"]}
+
+    payload["preferred_categories"] = ["world", "science"]
+    assert (await client.post("/api/user/preferences", json=payload)).status_code == 200
+    assert (await client.get("/api/user/preferences/api-user/categories")).json() == {"categories": ["world", "science"]}
+
+    await client.post("/api/user/preferences/api-user/categories", json=["sports"])
+    assert (await client.get("/api/user/preferences/api-user")).json()["preferred_categories"] == ["sports"]
+
+    stats = (await client.get("/api/user/cache/stats")).json()
+    assert stats == {"hits": 0, "misses": 3, "invalidations": 3, "hit_rate": 0.0}
+
+async def test_cache_stats_endpoint(client, preferences):
+    for _ in range(3):
+        assert (await client.get("/api/user/preferences/stats-user/categories")).status_code == 200
+    stats = (await client.get("/api/user/cache/stats")).json()
+    assert stats == {"hits": 2, "misses": 1, "invalidations": 0, "hit_rate": 0.6667}
@@ -0,0 +1,6 @@
+import os
+
+from backend.core.query_plans import query_plan_failures
+
+def test_hot_queries_use_indexes():
+    assert query_plan_failures(os.environ["DATABASE_URL"]) == []
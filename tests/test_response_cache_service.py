@@ -0,0 +1,79 @@
+import pytest
+
+from backend.api.routes import chat
+from backend.services.context_service import ChatContext
+from backend.services.response_cache_service import ResponseCacheService
+from tests.factories import make_article
+
+ARTICLES = [make_article(1), make_article(2)]
+
+@pytest.fixture
+def cache():
+    service = ResponseCacheService()
+    service.enabled = True
+    service.similarity = 0.75
+    return service
+
+def test_exact_questions_hit_after_normalization(cache):
+    cache.set("How are the markets doing today?", ARTICLES, "Steady.")
+    assert cache.get("how are the markets doing today", ARTICLES) == "Steady."
+    assert cache.stats["exact_hits"] == 1
+
+def test_slightly_reworded_questions_hit(cache):
+    cache.set("How are the markets doing today?", ARTICLES, "Steady.")
+    assert cache.get("So how are the markets doing today?", ARTICLES) == "Steady."
+    assert cache.stats["similar_hits"] == 1
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Are the markets up today?", "Are the markets down today?"),
+    ("Should I buy Tesla stock?", "Should I not buy Tesla stock?"),
+    ("Should I buy Tesla stock?", "Should I sell Tesla stock?"),
+    ("Is it going to rain today?", "Isn't it going to rain today?"),
+])
+def test_opposite_questions_miss(cache, cached, asked):
+    cache.set(cached, ARTICLES, "Cached answer.")
+    assert cache.get(asked, ARTICLES) is None
+    assert cache.stats["misses"] == 1
+
+def test_other_news_context_misses(cache):
+    cache.set("How are the markets doing today?", ARTICLES, "Steady.")
+    assert cache.get("How are the markets doing today?", [make_article(3)]) is None
+
+def test_expired_entries_miss(cache):
+    cache.ttl = 0
+    cache.set("How are the markets doing today?", ARTICLES, "Steady.")
+    assert cache.get("How are the markets doing today?", ARTICLES) is None
+    assert cache.stats["expirations"] == 1
+
+def test_evicts_least_recently_used(cache):
+    cache.maxsize = 2
+    cache.set("first question", ARTICLES, "1")
+    cache.set("second question", ARTICLES, "2")
+    cache.get("first question", ARTICLES)
+    cache.set("third question", ARTICLES, "3")
+    assert cache.get("second question", ARTICLES) is None
+    assert cache.get("first question", ARTICLES) == "1"
+
+def test_only_first_turns_are_eligible(cache):
+    assert cache.eligible(ChatContext())
+    assert not cache.eligible(ChatContext(summary="Earlier we discussed rates."))
+
+async def test_repeated_first_turns_are_served_from_the_cache_through_the_routes(client, openai_stub, monkeypatch, cache):
+    monkeypatch.setattr(chat, "response_cache_service", cache)
+    stub = openai_stub(reply="Markets are steady.")
+    question = {"message": "How are the markets doing today?"}
+
+    first = await client.post("/api/chat/message", json={**question, "user_id": "u1"})
+    second = await client.post("/api/chat/message", json={**question, "user_id": "u2"})
+    async with client.stream("POST", "/api/chat/message/stream", json={**question, "user_id": "u3"}) as response:
+        body = (await response.aread()).decode()
+
+    assert first.json()["response"] == second.json()["response"] == "Markets are steady."
+    assert 'data: {"content": "Markets are steady."}' in body
+    assert stub.state.stats["requests"] == 1
+    assert cache.stats["exact_hits"] == 2
+
+    # A follow-up depends on the conversation, so it goes to the model
+    await client.post("/api/chat/message", json={**question, "session_id": first.json()["session_id"]})
+    assert stub.state.stats["requests"] == 2
+    assert cache.stats["ineligible"] == 1
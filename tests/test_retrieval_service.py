@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.models import Article
+from backend.services.retrieval_service import ArticleIndex, RetrievalService
+
+def hours_ago(hours):
+    return datetime.utcnow() - timedelta(hours=hours)
+
+async def store(db, title, published_hours_ago=1, **fields):
+    article = Article(
+        title=title,
+        summary=fields.pop("summary", f"{title} in detail."),
+        source="Stub Wire",
+        dedup_key=title,
+        published_at=hours_ago(published_hours_ago),
+        created_at=fields.pop("created_at", datetime.utcnow()),
+        **fields,
+    )
+    db.add(article)
+    await db.commit()
+    return article
+
+@pytest.fixture
+def service():
+    return RetrievalService()
+
+def test_index_ranks_title_matches_first():
+    index = ArticleIndex()
+    index.add(1, "Weather update", "Rain expected while the central bank meets")
+    index.add(2, "Central bank raises rates", "The decision surprised markets")
+    index.add(3, "Football results", "A late goal settled it")
+    assert [article_id for article_id, _ in index.search("central bank")] == [2, 1]
+
+def test_index_skips_articles_before_since():
+    index = ArticleIndex()
+    index.add(1, "Central bank raises rates", None, timestamp=100.0)
+    index.add(2, "Central bank holds rates", None, timestamp=200.0)
+    assert [article_id for article_id, _ in index.search("central bank", since=150.0)] == [2]
+
+async def test_rebuild_indexes_only_recent_canonical_articles(db, service):
+    fresh = await store(db, "Central bank raises rates")
+    await store(db, "Central bank raised rates last year", published_hours_ago=24 * 365)
+    await store(db, "Central bank raises rates again", canonical_id=fresh.id)
+
+    await service.rebuild()
+    assert service.search("central bank rates") == [fresh.id]
+
+async def test_search_drops_articles_that_age_out(db, service):
+    article = await store(db, "Central bank raises rates", published_hours_ago=10)
+    await service.rebuild()
+    assert service.search("central bank") == [article.id]
+
+    service.window = timedelta(hours=5)
+    assert service.search("central bank") == []
+
+async def test_refresh_picks_up_articles_other_workers_stored(db, service):
+    await service.rebuild()
+    from_other_worker = await store(db, "Central bank raises rates")
+    # This worker's own ingest indexes a newer article first
+    own = await store(db, "Central bank holds rates")
+    service.add_articles([own])
+
+    await service.refresh()
+    assert set(service.search("central bank")) == {from_other_worker.id, own.id}
+
+async def test_refresh_rebuilds_once_enough_has_aged_out(db, service):
+    await store(db, "Old central bank story", published_hours_ago=10)
+    recent = await store(db, "New central bank story", published_hours_ago=1)
+    await service.rebuild()
+    assert len(service.index) == 2
+
+    service.window = timedelta(hours=5)
+    await service.refresh()
+    assert service.stats["rebuilds"] == 2
+    assert len(service.index) == 1
+    assert service.search("central bank") == [recent.id]
@@ -0,0 +1,111 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from backend.core.database import async_database_url
+from backend.core.migrations import run_migrations
+from backend.models.models import Article
+from backend.services.search_service import SearchService
+
+async def store(db, title, summary="", canonical_id=None):
+    article = Article(title=title, summary=summary, source="Stub Wire", dedup_key=title, canonical_id=canonical_id)
+    db.add(article)
+    await db.commit()
+    return article
+
+async def all_pages(service, db, query, limit):
+    pages, after = [], None
+    while True:
+        rows, has_more = await service.search(db, query, limit=limit, after=after)
+        pages.append([row["id"] for row in rows])
+        if not has_more:
+            return pages
+        after = {"score": rows[-1]["score"], "id": rows[-1]["id"]}
+
+async def test_ranks_title_matches_above_body_matches(db):
+    body = await store(db, "Morning roundup", "The central bank held rates")
+    title = await store(db, "Central bank holds rates")
+    rows, has_more = await SearchService().search(db, "central bank")
+    assert [row["id"] for row in rows] == [title.id, body.id]
+    assert "<mark>" in rows[0]["snippet"]
+    assert not has_more
+
+async def test_drops_near_duplicates_before_the_candidate_cap(db):
+    service = SearchService()
+    service.candidate_limit = 3
+    originals = [await store(db, f"Central bank story {index}") for index in range(3)]
+    # Newer copies must not use up the candidate slots
+    for original in originals:
+        await store(db, f"Central bank copy of {original.id}", canonical_id=original.id)
+
+    rows, _ = await service.search(db, "central bank")
+    assert sorted(row["id"] for row in rows) == [original.id for original in originals]
+
+async def test_pages_cover_every_candidate_once(db):
+    articles = [await store(db, f"Central bank story {index}", "central " * (index % 3)) for index in range(7)]
+    service = SearchService()
+    pages = await all_pages(service, db, "central bank", limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sorted(sum(pages, [])) == [article.id for article in articles]
+
+async def test_zero_candidate_limit_ranks_every_match(db):
+    for index in range(5):
+        await store(db, f"Central bank story {index}")
+    service = SearchService()
+    service.candidate_limit = 0
+    rows, _ = await service.search(db, "central bank", limit=10)
+    assert len(rows) == 5
+
+class RecordingSession:
+    """Enough of an AsyncSession on Postgres to capture the search statement"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    async def execute(self, statement, params=None):
+        self.calls.append((str(statement), params))
+        return []
+
+async def test_postgres_filters_near_duplicates_before_the_candidate_cap():
+    session = RecordingSession()
+    service = SearchService()
+    service.candidate_limit = 0
+    assert await service.search(session, "central bank -rates", limit=5) == ([], False)
+
+    (sql, params), = session.calls
+    candidates = sql[sql.index("WITH candidates"):sql.index("), ranked")]
+    assert candidates.index("a.canonical_id IS NULL") < candidates.index("LIMIT :candidates")
+    # websearch_to_tsquery parses the raw input itself
+    assert params["query"] == "central bank -rates"
+    assert params["candidates"] is None
+    assert params["limit"] == 6
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="set TEST_POSTGRES_URL to run against Postgres")
+async def test_postgres_search_matches_sqlite_behaviour():
+    url = os.environ["TEST_POSTGRES_URL"]
+    run_migrations(url)
+    engine = create_async_engine(async_database_url(url))
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            original = await store(db, "Central bank holds rates")
+            await store(db, "Central bank holds rates again", canonical_id=original.id)
+            body = await store(db, "Morning roundup", "The central bank held rates")
+
+            service = SearchService()
+            service.candidate_limit = 2
+            rows, has_more = await service.search(db, "central bank")
+            assert [row["id"] for row in rows] == [original.id, body.id]
+            assert "<mark>" in rows[0]["snippet"]
+            assert not has_more
+
+            await db.execute(text("DELETE FROM articles WHERE id IN (:a, :b) OR canonical_id = :a"),
+                             {"a": original.id, "b": body.id})
+            await db.commit()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,109 @@
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis.asyncio
+
+from backend.core.singleflight import RedisSingleFlight, SingleFlight, SingleFlightError
+from benchmarks.stub_servers import _free_port
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Factory for RedisSingleFlight groups in separate "workers" sharing one fake Redis"""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.asyncio, "from_url",
+        lambda url, **options: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    )
+
+    def create(count=2, lock_ttl=5.0):
+        return [RedisSingleFlight("test", lock_ttl=lock_ttl, poll_interval=0.01) for _ in range(count)]
+
+    return create
+
+class Upstream:
+    """Counts calls to a slow upstream"""
+
+    def __init__(self, delay=0.1, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"summary": f"result {self.calls}"}
+
+async def test_coalesces_concurrent_calls_in_one_worker():
+    flight, upstream = SingleFlight("test"), Upstream()
+    results = await asyncio.gather(*[flight.do("key", upstream) for _ in range(5)])
+    assert upstream.calls == 1
+    assert results == [{"summary": "result 1"}] * 5
+
+async def test_local_errors_reach_every_caller():
+    flight, upstream = SingleFlight("test"), Upstream(error=ValueError("boom"))
+    results = await asyncio.gather(*[flight.do("key", upstream) for _ in range(3)], return_exceptions=True)
+    assert upstream.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+async def test_coalesces_across_workers(workers):
+    upstream = Upstream()
+    results = await asyncio.gather(*[worker.do("key", upstream) for worker in workers(3) for _ in range(2)])
+    assert upstream.calls == 1
+    assert results == [{"summary": "result 1"}] * 6
+
+async def test_slow_leader_keeps_its_lock_past_the_ttl(workers):
+    # The call takes three lock TTLs; without extending the lock a follower would take over
+    upstream = Upstream(delay=0.6)
+    first, second = workers(lock_ttl=0.2)
+    leader = asyncio.create_task(first.do("key", upstream))
+    await asyncio.sleep(0.05)
+    results = await asyncio.gather(leader, second.do("key", upstream))
+    assert upstream.calls == 1
+    assert results[0] == results[1]
+
+async def test_slow_follower_still_gets_the_result(workers):
+    upstream = Upstream(delay=0.1)
+    first, second = workers(lock_ttl=2.0)
+    second.poll_interval = 1.5
+    leader = asyncio.create_task(first.do("key", upstream))
+    await asyncio.sleep(0.02)
+    # Polls again long after the old one-second result TTL
+    results = await asyncio.gather(leader, second.do("key", upstream))
+    assert upstream.calls == 1
+    assert results[0] == results[1]
+
+async def test_calls_after_a_run_finished_start_a_new_one(workers):
+    upstream = Upstream(delay=0.01)
+    first, second = workers()
+    assert await first.do("key", upstream) == {"summary": "result 1"}
+    assert await second.do("key", upstream) == {"summary": "result 2"}
+
+async def test_leader_errors_reach_other_workers(workers):
+    upstream = Upstream(error=ValueError("boom"))
+    first, second = workers()
+    leader = asyncio.create_task(first.do("key", upstream))
+    await asyncio.sleep(0.02)
+    with pytest.raises(SingleFlightError, match="boom"):
+        await second.do("key", upstream)
+    with pytest.raises(ValueError):
+        await leader
+    assert upstream.calls == 1
+
+async def test_takes_over_from_a_dead_leader(workers):
+    first, second = workers(lock_ttl=0.2)
+    # A leader that took the lock and died without releasing it
+    await first._acquire(keys=["singleflight:test:key:lock"], args=["dead", 200])
+    upstream = Upstream(delay=0.01)
+    assert await second.do("key", upstream) == {"summary": "result 1"}
+    assert upstream.calls == 1
+
+async def test_runs_locally_when_redis_is_down():
+    flight = RedisSingleFlight("test", url=f"redis://127.0.0.1:{_free_port()}/0")
+    upstream = Upstream(delay=0.05)
+    results = await asyncio.gather(*[flight.do("key", upstream) for _ in range(3)])
+    assert upstream.calls == 1
+    assert results == [{"summary": "result 1"}] * 3
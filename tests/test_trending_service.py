@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.trending_service import TrendingService
+from tests.factories import make_article
+
+def article(article_id, title, hours_ago=0.0, summary=""):
+    return make_article(article_id, title, summary=summary, published_at=datetime.utcnow() - timedelta(hours=hours_ago))
+
+@pytest.fixture
+def service():
+    return TrendingService()
+
+def topics(rows, kind="term"):
+    return [row["topic"] for row in rows if row["kind"] == kind]
+
+async def test_ranks_by_number_of_mentions(db, service):
+    await service.update(db, [
+        article(1, "Tariffs rattle exporters"),
+        article(2, "Tariffs hit farmers"),
+        article(3, "Election polls tighten"),
+    ])
+    rows = await service.top(db)
+    assert topics(rows)[0] == "tariffs"
+    assert rows[0]["articles"] == 2
+
+async def test_older_mentions_decay(db, service):
+    half_life = settings.TRENDING_HALF_LIFE_HOURS
+    # Two mentions two half-lives ago are worth half of one mention now
+    await service.update(db, [
+        article(1, "Tariffs rattle exporters", hours_ago=2 * half_life),
+        article(2, "Tariffs hit farmers", hours_ago=2 * half_life),
+        article(3, "Election polls tighten"),
+    ])
+    rows = {row["topic"]: row for row in await service.top(db, limit=20)}
+    assert rows["election"]["score"] == pytest.approx(1.0, rel=0.01)
+    assert rows["tariffs"]["score"] == pytest.approx(0.5, rel=0.01)
+
+async def test_counts_accumulate_across_updates(db, service):
+    await service.update(db, [article(1, "Tariffs rattle exporters")])
+    await service.update(db, [article(2, "Tariffs hit farmers")])
+    rows = {row["topic"]: row for row in await service.top(db, limit=20)}
+    assert rows["tariffs"]["articles"] == 2
+    assert rows["tariffs"]["score"] == pytest.approx(2.0, rel=0.01)
+
+async def test_extracts_named_entities(db, service):
+    await service.update(db, [article(1, "Federal Reserve holds rates as Jerome Powell urges patience")])
+    assert {"Federal Reserve", "Jerome Powell"} <= set(topics(await service.top(db, limit=20), kind="entity"))
+
+async def test_ignores_and_expires_terms_outside_the_window(db, service):
+    window = service.window.total_seconds() / 3600
+    await service.update(db, [article(1, "Tariffs rattle exporters", hours_ago=window - 1)])
+    await service.update(db, [article(2, "Ancient scandal resurfaces", hours_ago=window + 1)])
+    assert "scandal" not in topics(await service.top(db, limit=20))
+
+    service.window = timedelta(hours=window - 2)
+    await service.update(db, [article(3, "Election polls tighten")])
+    assert set(topics(await service.top(db, limit=20))) == {"election", "polls", "tighten"}
+
+async def test_trending_endpoint(client, db, service):
+    await service.update(db, [article(1, "Tariffs rattle exporters"), article(2, "Tariffs hit farmers")])
+    response = await client.get("/api/news/trending", params={"limit": 1})
+    assert response.status_code == 200
+    assert response.json()["topics"][0]["topic"] == "tariffs"